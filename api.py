@@ -0,0 +1,115 @@
+"""JSON/CSV prediction API for integrators.
+
+The pipeline is loaded when the module is imported, so under gunicorn with
+``preload_app`` it is unpickled once in the master and shared copy-on-write
+by every worker:
+
+    gunicorn -c gunicorn.conf.py api:app
+
+POST /predict accepts a single JSON object, a list of objects, or
+{"instances": [...]}, keyed by the EXPECTED_FEATURES names. A text/csv body
+with a header row is accepted too. ``?threshold=0.3`` flags rows whose
+positive-class probability is above 0.3 instead of taking the likelier
+class. Single-row requests are coalesced by a MicroBatcher
+(PD_MICROBATCH_MS / PD_MICROBATCH_SIZE, 0 ms disables it) and GET /metrics
+reports its batching and latency counters.
+"""
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from flask import Flask, jsonify, request
+
+from inference import (ARTIFACT_PATH, EXPECTED_FEATURES, classify, configured_model_path, feature_matrix,
+                       load_pipeline, missing_features, positive_proba)
+from microbatch import MicroBatcher
+
+
+def _parse_rows() -> pd.DataFrame:
+    if request.mimetype in ('text/csv', 'application/csv'):
+        return pd.read_csv(io.BytesIO(request.get_data()))
+
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict) and 'instances' in payload:
+        payload = payload['instances']
+    if isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list) or not all(isinstance(row, dict) for row in payload):
+        raise ValueError("Expected a JSON object, a list of objects or {\"instances\": [...]}")
+    return pd.DataFrame.from_records(payload)
+
+
+def create_app(model_path: str = ARTIFACT_PATH, microbatch_ms: float = 2.0,
+               microbatch_size: int = 64) -> Flask:
+    app = Flask(__name__)
+    pipeline = load_pipeline(model_path)
+    classes = np.asarray(pipeline.classes_)
+
+    # Threads do not survive gunicorn's fork, so each worker starts its own batcher on first use
+    batcher_lock = threading.Lock()
+    batchers = {}
+
+    def get_batcher():
+        pid = os.getpid()
+        if pid not in batchers:
+            with batcher_lock:
+                if pid not in batchers:
+                    batchers.clear()
+                    batchers[pid] = MicroBatcher(pipeline.predict_proba, microbatch_size, microbatch_ms)
+        return batchers[pid]
+
+    @app.get('/health')
+    def health():
+        return jsonify(status='ok', features=EXPECTED_FEATURES)
+
+    @app.post('/predict')
+    def predict():
+        try:
+            df = _parse_rows()
+        except (ValueError, pd.errors.ParserError) as e:
+            return jsonify(error=str(e)), 400
+        if df.empty:
+            return jsonify(error="No rows to score"), 400
+
+        missing_cols = missing_features(df.columns)
+        if missing_cols:
+            return jsonify(error=f"Missing features: {', '.join(missing_cols)}"), 400
+        try:
+            features = feature_matrix(df)
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+
+        threshold = request.args.get('threshold')
+        if threshold is not None:
+            try:
+                threshold = float(threshold)
+            except ValueError:
+                threshold = float('nan')
+            if not 0.0 <= threshold <= 1.0:
+                return jsonify(error="threshold must be a number between 0 and 1"), 400
+
+        # One predict_proba pass gives both the class and its probability
+        if len(features) == 1 and microbatch_ms > 0:
+            proba = get_batcher().predict(features[0])[np.newaxis, :]
+        else:
+            proba = pipeline.predict_proba(features)
+        predictions = classify(proba, classes, threshold)
+        return jsonify(
+            predictions=predictions.tolist(),
+            probabilities=positive_proba(proba).tolist(),
+        )
+
+    @app.get('/metrics')
+    def metrics():
+        return jsonify(microbatch=get_batcher().stats() if microbatch_ms > 0 else None)
+
+    return app
+
+
+app = create_app(
+    configured_model_path(),
+    microbatch_ms=float(os.environ.get('PD_MICROBATCH_MS', 2.0)),
+    microbatch_size=int(os.environ.get('PD_MICROBATCH_SIZE', 64)),
+)
@@ -1,11 +1,10 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-import pickle
-import folium
-from streamlit_folium import folium_static
-from typing import Dict, List, Optional
+import streamlit.components.v1 as components
+import startup_profile
+from locations import LocationManager
+
+# Heavy modules (pandas, folium via center_map, the model code) are imported
+# through startup_profile.import_module by the tab that needs them
 
 # Page config
 st.set_page_config(
@@ -58,152 +57,41 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Location Manager Class
-class LocationManager:
-    def __init__(self):
-        self.centers_data = {
-            'Parkinsons Treatment Centers': [
-                {
-                    'name': 'NIMHANS - National Institute of Mental Health and Neurosciences',
-                    'address': 'Hosur Road, Near Dairy Circle',
-                    'area': 'Bangalore South',
-                    'city': 'Bengaluru',
-                    'state': 'Karnataka',
-                    'lat': 12.9374,
-                    'lon': 77.5958,
-                    'specialties': ['Movement Disorders', 'Neurology', 'DBS Surgery', 'Research'],
-                    'phone': '080-26995000',
-                    'description': 'Premier neurological institute with specialized Parkinson\'s treatment unit'
-                },
-                {
-                    'name': 'Manipal Hospital',
-                    'address': '98, HAL Old Airport Road',
-                    'area': 'Kodihalli',
-                    'city': 'Bengaluru',
-                    'state': 'Karnataka',
-                    'lat': 12.9583,
-                    'lon': 77.6408,
-                    'specialties': ['Movement Disorders', 'Neurology', 'Rehabilitation'],
-                    'phone': '080-25023355',
-                    'description': 'Comprehensive neurology center with advanced Parkinson\'s treatment facilities'
-                },
-                {
-                    'name': 'Apollo Hospital',
-                    'address': '154/11, Opp. IIM Bangalore',
-                    'area': 'Bannerghatta Road',
-                    'city': 'Bengaluru',
-                    'state': 'Karnataka',
-                    'lat': 12.8918,
-                    'lon': 77.6014,
-                    'specialties': ['Neurology', 'Movement Disorders', 'Physical Therapy'],
-                    'phone': '080-43561234',
-                    'description': 'Specialized movement disorders clinic with multidisciplinary approach'
-                },
-                {
-                    'name': 'Columbia Asia Hospital',
-                    'address': '26/1, Dr. Rajkumar Road',
-                    'area': 'Malleswaram',
-                    'city': 'Bengaluru',
-                    'state': 'Karnataka',
-                    'lat': 13.0159,
-                    'lon': 77.5555,
-                    'specialties': ['Neurology', 'Physical Therapy', 'Rehabilitation'],
-                    'phone': '080-39898969',
-                    'description': 'Dedicated neurology department with focus on movement disorders'
-                },
-                {
-                    'name': 'Fortis Hospital',
-                    'address': '154/9, Bannerghatta Road',
-                    'area': 'Bangalore South',
-                    'city': 'Bengaluru',
-                    'state': 'Karnataka',
-                    'lat': 12.8898,
-                    'lon': 77.5990,
-                    'specialties': ['Movement Disorders', 'DBS Surgery', 'Rehabilitation'],
-                    'phone': '080-66214444',
-                    'description': 'Advanced neurological care center with DBS surgery facilities'
-                }
-            ]
-        }
-        self.areas = self._extract_areas()
-        
-    def _extract_areas(self) -> List[str]:
-        return list(set(center['area'] for center in self.centers_data['Parkinsons Treatment Centers']))
-    
-    def get_center_by_name(self, name: str) -> Optional[Dict]:
-        return next(
-            (center for center in self.centers_data['Parkinsons Treatment Centers'] 
-             if center['name'] == name),
-            None
-        )
-    
-    def get_centers_in_area(self, area: str) -> List[Dict]:
-        return [
-            center for center in self.centers_data['Parkinsons Treatment Centers'] 
-            if center['area'] == area
-        ]
-    
-    def get_all_centers(self) -> List[Dict]:
-        return self.centers_data['Parkinsons Treatment Centers']
-
-# Map Creation Function
-def create_center_map(selected_center: Dict, all_centers: List[Dict], radius_km: float = 5) -> folium.Map:
-    m = folium.Map(
-        location=[selected_center['lat'], selected_center['lon']],
-        zoom_start=12,
-        tiles='OpenStreetMap'
-    )
-    
-    # Add marker for selected center
-    folium.Marker(
-        [selected_center['lat'], selected_center['lon']],
-        popup=folium.Popup(
-            f"""
-            <div style='width: 200px'>
-                <b>{selected_center['name']}</b><br>
-                {selected_center['address']}<br>
-                <b>Specialties:</b><br>
-                {', '.join(selected_center['specialties'])}<br>
-                📞 {selected_center['phone']}
-            </div>
-            """,
-            max_width=300
-        ),
-        icon=folium.Icon(color='red', icon='info-sign'),
-        tooltip=selected_center['name']
-    ).add_to(m)
-    
-    # Add markers for other centers
-    for center in all_centers:
-        if center['name'] != selected_center['name']:
-            folium.Marker(
-                [center['lat'], center['lon']],
-                popup=folium.Popup(
-                    f"""
-                    <div style='width: 200px'>
-                        <b>{center['name']}</b><br>
-                        {center['address']}<br>
-                        <b>Specialties:</b><br>
-                        {', '.join(center['specialties'])}<br>
-                        📞 {center['phone']}
-                    </div>
-                    """,
-                    max_width=300
-                ),
-                icon=folium.Icon(color='blue', icon='info-sign'),
-                tooltip=center['name']
-            ).add_to(m)
-    
-    # Add coverage radius
-    folium.Circle(
-        [selected_center['lat'], selected_center['lon']],
-        radius=radius_km * 1000,  # Convert km to meters
-        color='red',
-        fill=True,
-        fillOpacity=0.1
-    ).add_to(m)
-    
-    return m
+# Number of rendered maps kept in the shared cache (least recently used are evicted)
+MAP_CACHE_ENTRIES = 64
+
+# Default search radius around the selected center
+DEFAULT_RADIUS_KM = 10
+
+# Nearest centers listed next to the map; the map shows all of them
+MAX_NEARBY_LISTED = 10
+
+# Seconds between progress updates of a running prediction job
+JOB_POLL_SECONDS = 1.0
+
+# Seconds the "Make Predictions" click waits for a job, so small uploads show without polling
+JOB_WAIT_SECONDS = 0.5
+
+
+# One LocationManager (and its memory-mapped registry) shared by every session and rerun
+@st.cache_resource
+def get_location_manager() -> LocationManager:
+    return LocationManager()
+
+
+# Rendered map HTML keyed by (center, radius, registry version), shared across sessions
+@st.cache_data(max_entries=MAP_CACHE_ENTRIES, show_spinner=False)
+def render_center_map(center_name: str, radius_km: float, registry_version: int) -> str:
+    location_mgr = get_location_manager()
+    selected_center = location_mgr.get_center_by_name(center_name)
+    # Only the centers inside the radius get markers (spatial index query)
+    nearby_centers = [
+        center for center, _ in
+        location_mgr.centers_within(selected_center['lat'], selected_center['lon'], radius_km)
+    ]
+    center_map = startup_profile.import_module('center_map')
+    m = center_map.create_center_map(selected_center, nearby_centers, radius_km)
+    return center_map.render_map_html(m)
 
 
 
@@ -218,7 +106,7 @@ tab1, tab2, tab3, tab4 = st.tabs([
     "🏥 Find Treatment Centers"
 ])
 
-with tab1:
+with tab1, startup_profile.section("tab1: About Parkinson's Disease"):
     st.markdown("""
     <div class="info-card">
         <h2 style='color: #1f2937;'>Understanding Parkinson's Disease</h2>
@@ -338,144 +226,236 @@ with tab1:
     </div>
     """, unsafe_allow_html=True)
 
-with tab2:
+with tab2, startup_profile.section('tab2: Prediction Tool'):
     st.markdown("""
     <div class="info-card">
         <h2 style='color: #1f2937;'>Voice Analysis Prediction Tool</h2>
         <p style='color: #4b5563;'>
-        Upload a CSV file containing voice measurements to predict the likelihood of Parkinson's Disease.
+        Upload a CSV, Parquet, Feather or Arrow file containing voice measurements to predict the likelihood of Parkinson's Disease.
         The file should contain all required voice measurement features listed in the Feature Information tab.
         </p>
     </div>
     """, unsafe_allow_html=True)
     
-    # Define the expected features in correct order
-    EXPECTED_FEATURES = [
-        'MDVP:Fo(Hz)', 'MDVP:Fhi(Hz)', 'MDVP:Flo(Hz)', 'MDVP:Jitter(%)',
-        'MDVP:Jitter(Abs)', 'MDVP:RAP', 'MDVP:PPQ', 'Jitter:DDP',
-        'MDVP:Shimmer', 'MDVP:Shimmer(dB)', 'Shimmer:APQ3', 'Shimmer:APQ5',
-        'MDVP:APQ', 'Shimmer:DDA', 'NHR', 'HNR', 'RPDE', 'DFA', 
-        'spread1', 'spread2', 'D2', 'PPE'
-    ]
+    inference = startup_profile.import_module('inference')
+    scoring_engine = startup_profile.import_module('scoring_engine')
+    ingest = startup_profile.import_module('ingest')
 
-    # Load the model
+    # Load the model artifact (or pickled pipeline / compiled .npz kernel) once per process
     @st.cache_resource
     def load_model():
-        return pickle.load(open('parkinson_classifier_model.pkl', 'rb'))
+        return inference.load_pipeline(inference.configured_model_path())
+
+    # Large uploads are sharded across a process pool shared by all sessions
+    @st.cache_resource
+    def load_scorer():
+        return scoring_engine.ParallelScorer(inference.configured_model_path(), pipeline=load_model())
+
+    # Row-level prediction cache shared by all sessions, keyed by row hash and model version
+    @st.cache_resource
+    def load_prediction_cache():
+        prediction_cache = startup_profile.import_module('prediction_cache')
+        return prediction_cache.PredictionCache(
+            prediction_cache.model_version(inference.configured_model_path()),
+            max_bytes=prediction_cache.configured_max_bytes(),
+            disk_path=prediction_cache.configured_cache_path(),
+        )
+
+    # Parsed feature matrices keyed by upload digest, shared by all sessions and reruns
+    @st.cache_resource
+    def load_upload_cache():
+        upload_cache = startup_profile.import_module('upload_cache')
+        max_entries, max_bytes = upload_cache.configured_limits()
+        return upload_cache.UploadCache(max_entries, max_bytes)
+
+    # Background scoring jobs shared by all sessions; progress and results are kept on disk
+    @st.cache_resource
+    def load_job_queue():
+        prediction_jobs = startup_profile.import_module('prediction_jobs')
+        scorer, prediction_cache = load_scorer(), load_prediction_cache()
+        return prediction_jobs.JobQueue(
+            lambda features: prediction_cache.predict_proba(scorer.score_proba, features),
+            prediction_jobs.configured_jobs_dir(),
+            n_workers=prediction_jobs.configured_workers(),
+        )
+
+    # Polls a running job; the whole script reruns once it has finished
+    @st.fragment(run_every=JOB_POLL_SECONDS)
+    def show_job_progress(job_id):
+        status = job_queue.status(job_id)
+        if status is None or status['state'] in ('done', 'failed'):
+            st.rerun()
+        st.progress(status['done_rows'] / max(status['rows'], 1),
+                    text=f"Analyzing voice measurements... {status['done_rows']:,} of {status['rows']:,} rows")
 
     try:
         model = load_model()
-        scaler = MinMaxScaler()
+        prediction_cache = load_prediction_cache()
+        upload_cache = load_upload_cache()
+        job_queue = load_job_queue()
     except Exception as e:
         st.error(f"Error loading model: {str(e)}")
         st.stop()
 
     # File upload
-    uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
+    uploaded_file = st.file_uploader("Choose a CSV, Parquet, Feather or Arrow file", type=ingest.UPLOAD_TYPES)
 
     if uploaded_file is not None:
         try:
-            # Read the CSV file
-            df = pd.read_csv(uploaded_file)
+            pd = startup_profile.import_module('pandas')
+            file_format = ingest.detect_format(uploaded_file.name)
+
+            # Validate the header (or schema) before reading any data rows
+            missing_cols = inference.missing_features(ingest.read_header(uploaded_file, file_format))
+            if missing_cols:
+                st.error(f"Missing columns in the uploaded file: {', '.join(missing_cols)}")
+                st.stop()
             
-            # Show raw data
+            # Show raw data (only the first rows are parsed)
             st.markdown("""
             <div class="info-card">
                 <h3 style='color: #1f2937;'>Data Preview</h3>
             </div>
             """, unsafe_allow_html=True)
-            st.dataframe(df.head())
-            
-            # Verify all required features are present
-            missing_cols = set(EXPECTED_FEATURES) - set(df.columns)
-            if missing_cols:
-                st.error(f"Missing columns in the uploaded file: {', '.join(missing_cols)}")
-                st.stop()
+            st.dataframe(ingest.read_preview(uploaded_file, file_format))
             
-            # Select only the required features in correct order
-            df = df[EXPECTED_FEATURES]
+            # Parse the feature columns (float32 for CSV) once per distinct file;
+            # later reruns, such as the button click, reuse the cached matrix
+            upload_key = f"{ingest.upload_digest(uploaded_file)}.{file_format}"
+            features = upload_cache.get(upload_key)
+            if features is None:
+                with st.spinner("Reading voice measurements..."):
+                    try:
+                        matrix = inference.feature_matrix(ingest.read_features(uploaded_file, file_format))
+                    except ValueError as e:
+                        st.error(str(e))
+                        st.stop()
+                    features = upload_cache.put(upload_key, matrix)
             
-            # Scale the features
-            scaled_features = scaler.fit_transform(df)
+            threshold = st.slider(
+                "Decision threshold", 0.05, 0.95, 0.5, 0.05,
+                help="Rows whose probability of Parkinson's Disease is above this value are flagged as positive"
+            )
             
-            # Make predictions
+            # Make predictions in a background job, so long runs survive reruns and disconnects;
+            # only rows the prediction cache has not seen before reach the model
             if st.button("Make Predictions"):
-                with st.spinner("Analyzing voice measurements..."):
-                    predictions = model.predict(scaled_features)
-                    
-                    # Create results dataframe
-                    results_df = pd.DataFrame({
-                        'Row': range(1, len(predictions) + 1),
-                        'Prediction': ["Has Parkinson's Disease" if pred == 1 
-                                     else "Does not have Parkinson's Disease" 
-                                     for pred in predictions]
-                    })
-                    
-                    # Display results in a card
-                    st.markdown("""
-                    <div class="info-card">
-                        <h3 style='color: #1f2937;'>Prediction Results</h3>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    st.dataframe(results_df)
-                    
-                    # Display summary statistics
+                job_id = job_queue.submit(f"{upload_key}.{prediction_cache.model_version}", features)
+                st.session_state['prediction_job'] = {'upload': upload_key, 'job': job_id}
+                job_queue.wait(job_id, timeout=JOB_WAIT_SECONDS)
+            
+            job = st.session_state.get('prediction_job')
+            status = job_queue.status(job['job']) if job is not None and job['upload'] == upload_key else None
+            if status is not None and status['state'] == 'failed':
+                st.error(f"Prediction job failed: {status['error']}")
+            elif status is not None and status['state'] != 'done':
+                show_job_progress(job['job'])
+            elif status is not None:
+                results_view = startup_profile.import_module('results_view')
+                # One predict_proba pass gives both the class and its probability
+                proba = job_queue.result(job['job'])
+                predictions = inference.classify(proba, model.classes_, threshold)
+                summary = results_view.summarize(predictions)
+                cache_stats = prediction_cache.stats()
+                
+                # Display results in a card
+                st.markdown("""
+                <div class="info-card">
+                    <h3 style='color: #1f2937;'>Prediction Results</h3>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Only the current page is built and sent to the browser
+                col1, col2 = st.columns(2)
+                with col1:
+                    page_size = st.selectbox(
+                        "Rows per page", results_view.PAGE_SIZES,
+                        index=results_view.PAGE_SIZES.index(results_view.DEFAULT_PAGE_SIZE)
+                    )
+                n_pages = results_view.page_count(summary['total'], page_size)
+                if st.session_state.get('results_page', 1) > n_pages:
+                    st.session_state['results_page'] = n_pages
+                with col2:
+                    page = st.number_input("Page", 1, n_pages, key='results_page',
+                                           help=f"{n_pages:,} pages of {page_size} rows")
+                st.dataframe(results_view.page_frame(predictions, inference.positive_proba(proba), page, page_size))
+                
+                # The CSV is generated only when the download is requested
+                st.download_button(
+                    "Download all results (CSV)",
+                    data=lambda: results_view.to_csv(predictions, inference.positive_proba(proba)),
+                    file_name="predictions.csv",
+                    mime="text/csv",
+                    on_click="ignore",
+                )
+                st.caption(
+                    f"Prediction cache: {cache_stats['hits'] + cache_stats['disk_hits']:,} rows reused, "
+                    f"{cache_stats['scored_rows']:,} rows scored so far "
+                    f"({cache_stats['hit_rate']:.0%} hit rate)"
+                )
+                upload_stats = upload_cache.stats()
+                st.caption(
+                    f"Parsed uploads: {upload_stats['entries']} cached, "
+                    f"{upload_stats['bytes'] / 2**20:.1f} MB (peak {upload_stats['peak_bytes'] / 2**20:.1f} MB "
+                    f"of {upload_cache.max_bytes / 2**20:.0f} MB)"
+                )
+                
+                # Display summary statistics
+                st.markdown("""
+                <div class="info-card">
+                    <h3 style='color: #1f2937;'>Analysis Summary</h3>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
                     st.markdown("""
-                    <div class="info-card">
-                        <h3 style='color: #1f2937;'>Analysis Summary</h3>
+                    <div class="metric-card">
+                        <h4 style='color: #1f2937;'>Total Cases</h4>
+                        <p style='font-size: 24px; color: #3b82f6;'>{}</p>
                     </div>
-                    """, unsafe_allow_html=True)
-                    
-                    total_cases = len(predictions)
-                    positive_cases = np.sum(predictions == 1)
-                    negative_cases = np.sum(predictions == 0)
-                    
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.markdown("""
-                        <div class="metric-card">
-                            <h4 style='color: #1f2937;'>Total Cases</h4>
-                            <p style='font-size: 24px; color: #3b82f6;'>{}</p>
-                        </div>
-                        """.format(total_cases), unsafe_allow_html=True)
-                    with col2:
-                        st.markdown("""
-                        <div class="metric-card">
-                            <h4 style='color: #1f2937;'>Positive Cases</h4>
-                            <p style='font-size: 24px; color: #ef4444;'>{}</p>
-                        </div>
-                        """.format(positive_cases), unsafe_allow_html=True)
-                    with col3:
-                        st.markdown("""
-                        <div class="metric-card">
-                            <h4 style='color: #1f2937;'>Negative Cases</h4>
-                            <p style='font-size: 24px; color: #10b981;'>{}</p>
-                        </div>
-                        """.format(negative_cases), unsafe_allow_html=True)
-                    
-                    # Add visualization
+                    """.format(summary['total']), unsafe_allow_html=True)
+                with col2:
                     st.markdown("""
-                    <div class="info-card">
-                        <h3 style='color: #1f2937;'>Distribution of Predictions</h3>
+                    <div class="metric-card">
+                        <h4 style='color: #1f2937;'>Positive Cases</h4>
+                        <p style='font-size: 24px; color: #ef4444;'>{}</p>
                     </div>
-                    """, unsafe_allow_html=True)
-                    st.bar_chart(results_df['Prediction'].value_counts())
-                    
+                    """.format(summary['positive']), unsafe_allow_html=True)
+                with col3:
                     st.markdown("""
-                    <div class="info-card" style='background-color: #f0f9ff; border-left: 4px solid #3b82f6;'>
-                        <h4 style='color: #1f2937;'>⚠️ Important Note</h4>
-                        <p style='color: #4b5563;'>
-                        This tool is for screening purposes only and should not be used as a definitive diagnosis. 
-                        The results should be interpreted by healthcare professionals in conjunction with other clinical findings.
-                        Please consult with a qualified healthcare professional for proper medical evaluation and diagnosis.
-                        </p>
+                    <div class="metric-card">
+                        <h4 style='color: #1f2937;'>Negative Cases</h4>
+                        <p style='font-size: 24px; color: #10b981;'>{}</p>
                     </div>
-                    """, unsafe_allow_html=True)
+                    """.format(summary['negative']), unsafe_allow_html=True)
+                
+                # Add visualization (from the same counts)
+                st.markdown("""
+                <div class="info-card">
+                    <h3 style='color: #1f2937;'>Distribution of Predictions</h3>
+                </div>
+                """, unsafe_allow_html=True)
+                st.bar_chart(pd.Series({
+                    results_view.NEGATIVE_LABEL: summary['negative'],
+                    results_view.POSITIVE_LABEL: summary['positive'],
+                }, name='count'))
+                
+                st.markdown("""
+                <div class="info-card" style='background-color: #f0f9ff; border-left: 4px solid #3b82f6;'>
+                    <h4 style='color: #1f2937;'>⚠️ Important Note</h4>
+                    <p style='color: #4b5563;'>
+                    This tool is for screening purposes only and should not be used as a definitive diagnosis. 
+                    The results should be interpreted by healthcare professionals in conjunction with other clinical findings.
+                    Please consult with a qualified healthcare professional for proper medical evaluation and diagnosis.
+                    </p>
+                </div>
+                """, unsafe_allow_html=True)
                 
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
 
-with tab3:
+with tab3, startup_profile.section('tab3: Feature Information'):
     st.markdown("""
     <div class="info-card">
         <h2 style='color: #1f2937;'>Voice Measurement Features</h2>
@@ -551,7 +531,7 @@ with tab3:
     </div>
     """, unsafe_allow_html=True)
 
-with tab4:
+with tab4, startup_profile.section('tab4: Find Treatment Centers'):
     st.markdown("""
     <div class="info-card">
         <h2 style='color: #1f2937;'>Find Parkinson's Disease Treatment Centers</h2>
@@ -561,8 +541,10 @@ with tab4:
     </div>
     """, unsafe_allow_html=True)
     
-    # Initialize location manager
-    location_mgr = LocationManager()
+    # Shared location manager (built once per process)
+    location_mgr = get_location_manager()
+    # Picks up edits to the registry file without a restart
+    location_mgr.refresh()
     
     # Create columns for the hospital finder section
     map_col, info_col = st.columns([2, 1])
@@ -580,6 +562,8 @@ with tab4:
             [center['name'] for center in centers_in_area]
         )
         
+        radius_km = st.slider("Search radius (km)", 1, 50, DEFAULT_RADIUS_KM)
+        
         # Get selected center details
         selected_center = location_mgr.get_center_by_name(selected_center_name)
         
@@ -608,6 +592,25 @@ with tab4:
             </div>
             """, unsafe_allow_html=True)
             
+            # Other centers within the radius, nearest first
+            nearby = location_mgr.centers_within(selected_center['lat'], selected_center['lon'], radius_km)
+            others = [(center, distance) for center, distance in nearby
+                      if center['name'] != selected_center['name']]
+            nearby_items = ''.join(
+                f"<li>{center['name']} ({distance:.1f} km)</li>"
+                for center, distance in others[:MAX_NEARBY_LISTED]
+            ) or "<li>No other centers in this radius</li>"
+            if len(others) > MAX_NEARBY_LISTED:
+                nearby_items += f"<p>...and {len(others) - MAX_NEARBY_LISTED:,} more on the map</p>"
+            st.markdown(f"""
+            <div class="info-card">
+                <h4 style='color: #1f2937;'>Nearby Centers (within {radius_km} km)</h4>
+                <ol style='color: #4b5563;'>
+                    {nearby_items}
+                </ol>
+            </div>
+            """, unsafe_allow_html=True)
+            
             # Additional center resources section
             st.markdown("""
             <div class="info-card">
@@ -628,13 +631,13 @@ with tab4:
         </div>
         """, unsafe_allow_html=True)
         
-        # Create and display map
+        # Display the cached map (rebuilt only on a cache miss)
         if selected_center:
-            m = create_center_map(
-                selected_center,
-                location_mgr.get_all_centers()
+            components.html(
+                render_center_map(selected_center['name'], radius_km, location_mgr.version),
+                height=510,
+                width=700
             )
-            folium_static(m)
             
             # Show map legend
             st.markdown("""
@@ -642,12 +645,13 @@ with tab4:
                 <p style='color: #4b5563; font-size: 0.9em; margin: 0;'>
                     🎯 <b>Map Legend:</b><br>
                     • Red Marker: Selected Center<br>
-                    • Blue Markers: Other Centers<br>
-                    • Red Circle: 5km coverage radius<br>
+                    • Blue Markers: Other Centers within the radius<br>
+                    • Numbered Circles: Clusters of nearby centers (large registries)<br>
+                    • Red Circle: {}km coverage radius<br>
                     💡 Click markers for detailed information
                 </p>
             </div>
-            """, unsafe_allow_html=True)
+            """.format(radius_km), unsafe_allow_html=True)
 
     # Add treatment center resources
     st.markdown("""
@@ -689,4 +693,13 @@ st.markdown("""
     <p style='font-size: 0.8em;'>This tool is for screening purposes only. Please consult healthcare professionals for diagnosis.</p>
     <p style='font-size: 0.8em;'>© 2025 Parkinson's Disease Voice Analysis Tool</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Startup profile (PD_PROFILE_STARTUP=1): first-run import and tab render times for this process
+if startup_profile.ENABLED:
+    with st.sidebar.expander("⏱️ Startup profile", expanded=True):
+        st.table([
+            {'Kind': kind, 'Name': name, 'Time (ms)': round(ms, 1)}
+            for kind, name, ms in startup_profile.timings()
+        ])
+    startup_profile.log_report()
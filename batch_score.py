@@ -0,0 +1,146 @@
+"""Headless batch scoring for large voice-feature exports.
+
+Streams the input CSV in fixed-size chunks, predicts each chunk with the
+bundled pipeline and appends the results to a CSV or Parquet file, so memory
+stays bounded by the chunk size rather than the input size.
+
+    python batch_score.py clinic_export.csv predictions.parquet --chunksize 200000
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from inference import ARTIFACT_PATH, EXPECTED_FEATURES, configured_model_path, feature_matrix, missing_features
+from scoring_engine import ParallelScorer
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def positive_int(value: str) -> int:
+    # argparse type for counts that must be at least 1
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def read_chunks(path: str, chunksize: int, keep: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    # Check the header before parsing any data rows
+    header = pd.read_csv(path, nrows=0).columns
+    missing_cols = missing_features(header) + [col for col in keep or [] if col not in header]
+    if missing_cols:
+        raise ValueError(f"Missing columns in {path}: {', '.join(missing_cols)}")
+
+    dtypes = {col: np.float64 for col in EXPECTED_FEATURES}
+    usecols = EXPECTED_FEATURES + [col for col in keep or [] if col not in dtypes]
+    yield from pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize)
+
+
+class ResultWriter:
+    # Appends result chunks to a CSV or Parquet file without holding them in memory.
+    # They go to a temporary file next to the target, which is renamed over it only
+    # when every chunk was written, so a failed run leaves no partial output behind
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.format = 'parquet' if path.endswith(('.parquet', '.pq')) else 'csv'
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, chunk: pd.DataFrame):
+        if self.format == 'csv':
+            chunk.to_csv(self.tmp_path, mode='a' if self._wrote_header else 'w',
+                         header=not self._wrote_header, index=False)
+            self._wrote_header = True
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.tmp_path, table.schema)
+        self._parquet_writer.write_table(table)
+
+    def close(self, completed: bool = True):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        if not os.path.exists(self.tmp_path):
+            return
+        if completed:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(completed=exc_type is None)
+
+
+def score_file(input_path: str, output_path: str, model_path: str = ARTIFACT_PATH,
+               chunksize: int = DEFAULT_CHUNKSIZE, keep: Optional[List[str]] = None,
+               workers: int = 1, verbose: bool = False) -> int:
+    # Each chunk is split evenly across the worker processes
+    shard_size = -(-chunksize // workers)
+    start = time.perf_counter()
+    n_rows = 0
+
+    with ParallelScorer(model_path, n_workers=workers, shard_size=shard_size) as scorer, \
+            ResultWriter(output_path) as writer:
+        for chunk in read_chunks(input_path, chunksize, keep):
+            # Rows are numbered from the start of the file in error messages
+            predictions = scorer.score(feature_matrix(chunk, first_row=n_rows + 1))
+            result = pd.DataFrame({'Row': np.arange(n_rows + 1, n_rows + len(chunk) + 1)})
+            for col in keep or []:
+                result[col] = chunk[col].to_numpy()
+            result['Prediction'] = predictions
+            writer.write(result)
+
+            n_rows += len(chunk)
+            if verbose:
+                elapsed = time.perf_counter() - start
+                print(f"scored {n_rows:,} rows ({n_rows / elapsed:,.0f} rows/s)", file=sys.stderr)
+
+    return n_rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score a voice-feature CSV with the Parkinson's classifier.")
+    parser.add_argument('input', help="CSV file containing the voice measurement features")
+    parser.add_argument('output', help="Destination file (.csv, or .parquet/.pq)")
+    parser.add_argument('--model', default=configured_model_path(),
+                        help="Model file: .pdm artifact, pickled pipeline or compiled .npz tree kernel")
+    parser.add_argument('--chunksize', type=positive_int, default=DEFAULT_CHUNKSIZE, help="Rows parsed and scored per chunk")
+    parser.add_argument('--keep', nargs='*', default=[], help="Input columns copied to the output (e.g. an ID column)")
+    parser.add_argument('--workers', type=positive_int, default=1, help="Worker processes used to score each chunk")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Report progress after every chunk")
+    args = parser.parse_args(argv)
+
+    if os.path.abspath(args.input) == os.path.abspath(args.output):
+        parser.error("output must differ from input")
+
+    try:
+        n_rows = score_file(args.input, args.output, args.model, args.chunksize, args.keep,
+                            args.workers, args.verbose)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Wrote {n_rows:,} predictions to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Cold-start time and peak RSS of loading the model in a fresh interpreter.
+
+Each measurement runs in a new process: import inference, load the model
+file, score one row. Compares the pickled sklearn pipeline with the .pdm
+artifact. Run from the repository root:
+
+    python benchmarks/bench_cold_start.py --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+from inference import load_pipeline
+model = load_pipeline(sys.argv[1])
+loaded = time.perf_counter()
+model.predict([[197.076, 206.896, 192.055, 0.00289, 0.00001, 0.00166, 0.00168, 0.00498, 0.01098, 0.097,
+                0.00563, 0.0068, 0.00802, 0.01689, 0.00339, 26.775, 0.422229, 0.741367, -7.3483, 0.177551,
+                1.743867, 0.085569]])
+done = time.perf_counter()
+print(json.dumps({
+    'load_ms': (loaded - start) * 1000,
+    'first_predict_ms': (done - start) * 1000,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'sklearn_imported': 'sklearn' in sys.modules,
+}))
+"""
+
+
+def probe(model_path: str) -> dict:
+    out = subprocess.run([sys.executable, '-W', 'ignore', '-c', PROBE, model_path],
+                         cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('models', nargs='*', default=['parkinson_pipeline.pkl', 'parkinson_model.pdm'])
+    args = parser.parse_args()
+
+    print(f"{'model':<24}  {'load ms':>8}  {'first predict ms':>16}  {'peak RSS MB':>11}  sklearn")
+    for model_path in args.models:
+        runs = [probe(model_path) for _ in range(args.runs)]
+        median = {key: float(np.median([run[key] for run in runs]))
+                  for key in ('load_ms', 'first_predict_ms', 'max_rss_mb')}
+        print(f"{model_path:<24}  {median['load_ms']:>8.1f}  {median['first_predict_ms']:>16.1f}  "
+              f"{median['max_rss_mb']:>11.1f}  {'yes' if runs[0]['sklearn_imported'] else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Cross-validation through the imblearn pipeline vs. cached, memory-mapped folds.
+
+The uncached path is what train.py did before cv_cache.py: cross_validate
+and GridSearchCV over the full RandomOverSampler -> MinMaxScaler -> model
+pipeline, so every fit repeats its fold's oversampling and scaling and every
+task is sent the training matrix. The cached path prepares each fold once
+(cold), or finds it on disk (warm), and sends workers only the fold's path.
+Labels come from the shipped pipeline on a noisy resample of
+data/parkinsons.csv (see bench_tree_kernel.py). Mean CV scores must be
+identical. Run from the repository root:
+
+    python benchmarks/bench_cv_cache.py --rows 20000 --grid "K Neighbors"
+"""
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.model_selection import GridSearchCV, cross_validate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tree_kernel import training_data  # noqa: E402
+from cv_cache import Fold  # noqa: E402
+from train import (CV_FOLDS, PARAM_GRIDS, RANDOM_STATE, _cv, candidate_models,  # noqa: E402
+                   compare_models, grid_search, make_pipeline)
+
+SCORING = ['accuracy', 'precision', 'recall', 'f1']
+
+
+def pipeline_comparison(X, y, n_jobs: int):
+    return {name: {metric: float(np.mean(scores[f'test_{metric}'])) for metric in SCORING}
+            for name, scores in ((name, cross_validate(make_pipeline(model), X, y, cv=_cv(RANDOM_STATE),
+                                                       scoring=SCORING, n_jobs=n_jobs))
+                                 for name, model in candidate_models().items())}
+
+
+def pipeline_grid(name: str, X, y, n_jobs: int):
+    return GridSearchCV(make_pipeline(candidate_models()[name]), PARAM_GRIDS[name], cv=_cv(RANDOM_STATE),
+                        scoring='accuracy', n_jobs=n_jobs).fit(X, y)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--grid', nargs='*', default=['K Neighbors'], choices=sorted(PARAM_GRIDS),
+                        help="Grid searches to time after the model comparison")
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    args = parser.parse_args(argv)
+
+    X, y = training_data(args.rows)
+    n_models = len(candidate_models())
+    with tempfile.TemporaryDirectory() as cache_dir:
+        payload = len(pickle.dumps(X)) + len(pickle.dumps(y))
+        fold = Fold(0, os.path.join(cache_dir, '0123456789abcdef0123456789abcdef', 'fold0'))
+        print(f"{args.rows:,} rows; per task: {payload / 2**20:.1f} MB of arrays through the pipeline, "
+              f"{len(pickle.dumps(fold))} bytes for a cached fold")
+
+        print(f"{'stage':<26} {'pipeline s':>11} {'cold s':>8} {'warm s':>8} {'resample+scale fits':>20}")
+        expected, pipeline_time = timed(pipeline_comparison, X, y, args.n_jobs)
+        cold, cold_time = timed(compare_models, X, y, args.n_jobs, RANDOM_STATE, cache_dir)
+        warm, warm_time = timed(compare_models, X, y, args.n_jobs, RANDOM_STATE, cache_dir)
+        if not (cold == expected == warm):
+            print("Cached model comparison differs from the pipeline", file=sys.stderr)
+            return 1
+        print(f"{'compare models':<26} {pipeline_time:>11.2f} {cold_time:>8.2f} {warm_time:>8.2f} "
+              f"{f'{n_models * CV_FOLDS} -> {CV_FOLDS}':>20}")
+
+        for name in args.grid:
+            reference, pipeline_time = timed(pipeline_grid, name, X, y, args.n_jobs)
+            cached, cached_time = timed(grid_search, name, X, y, args.n_jobs, RANDOM_STATE, cache_dir)
+            if not (np.array_equal(reference.cv_results_['mean_test_score'], cached.cv_results_['mean_test_score'])
+                    and reference.best_params_ == cached.best_params_):
+                print(f"Cached grid search differs for {name}", file=sys.stderr)
+                return 1
+            n_fits = len(reference.cv_results_['params']) * CV_FOLDS
+            print(f"{f'grid search: {name}':<26} {pipeline_time:>11.2f} {'':>8} {cached_time:>8.2f} "
+                  f"{f'{n_fits} -> 0':>20}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
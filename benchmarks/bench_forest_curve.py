@@ -0,0 +1,93 @@
+"""Accuracy-vs-trees curve: a fresh forest per point vs. one warm-started forest.
+
+The refit path fits RandomForestClassifier(n_estimators=k, oob_score=True)
+from scratch for every point k, which is what the notebook's curve should
+have done. It scores the training and test rows and reads oob_score_. The
+incremental path is forest_curve.forest_curve. Train and test accuracies
+must match at every point, and OOB accuracy must match wherever every row
+already has an out-of-bag vote, since sklearn scores rows without one as
+the first class. Labels come from the shipped pipeline on a noisy resample
+of data/parkinsons.csv (see bench_tree_kernel.py). Run from the repository
+root:
+
+    python benchmarks/bench_forest_curve.py --rows 2000 --max-trees 80 --step 1
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import MinMaxScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_tree_kernel import training_data  # noqa: E402
+from forest_curve import forest_curve  # noqa: E402
+from train import RANDOM_STATE, TEST_SIZE, make_sampler  # noqa: E402
+
+
+def refit_curve(X_train, y_train, X_test, y_test, max_trees: int, step: int):
+    X_fit, y_fit = make_sampler(RANDOM_STATE).fit_resample(X_train, y_train)
+    scaler = MinMaxScaler().fit(X_fit)
+    X_fit, X_train, X_test = scaler.transform(X_fit), scaler.transform(X_train), scaler.transform(X_test)
+    curve = {'n_trees': [], 'train_accuracy': [], 'test_accuracy': [], 'oob_accuracy': []}
+    for n_trees in list(range(step, max_trees, step)) + [max_trees]:
+        with warnings.catch_warnings():
+            # Too few trees for every row to be out of bag at least once
+            warnings.simplefilter('ignore', UserWarning)
+            forest = RandomForestClassifier(n_estimators=n_trees, oob_score=True,
+                                            random_state=RANDOM_STATE).fit(X_fit, y_fit)
+        curve['n_trees'].append(n_trees)
+        curve['train_accuracy'].append(forest.score(X_train, y_train))
+        curve['test_accuracy'].append(forest.score(X_test, y_test))
+        covered = not np.isnan(forest.oob_decision_function_).any() and (forest.oob_decision_function_.sum(axis=1) > 0).all()
+        curve['oob_accuracy'].append(forest.oob_score_ if covered else np.nan)
+    return {name: np.asarray(values) for name, values in curve.items()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2_000)
+    parser.add_argument('--max-trees', type=int, default=80)
+    parser.add_argument('--step', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    X, y = training_data(args.rows)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TEST_SIZE, stratify=y, random_state=RANDOM_STATE)
+
+    start = time.perf_counter()
+    expected = refit_curve(X_train, y_train, X_test, y_test, args.max_trees, args.step)
+    refit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    curve = forest_curve(X_train, y_train, X_test, y_test, args.max_trees, args.step)
+    incremental_time = time.perf_counter() - start
+
+    for name in ('n_trees', 'train_accuracy', 'test_accuracy'):
+        if not np.array_equal(curve[name], expected[name]):
+            print(f"{name} differs from forests fitted from scratch", file=sys.stderr)
+            return 1
+    covered = ~np.isnan(expected['oob_accuracy'])
+    if not np.array_equal(curve['oob_accuracy'][covered], expected['oob_accuracy'][covered]):
+        print("oob_accuracy differs from oob_score_", file=sys.stderr)
+        return 1
+
+    n_points = len(curve['n_trees'])
+    trees_fitted = int(expected['n_trees'].sum())
+    print(f"{n_points} points up to {args.max_trees} trees on {len(X_train):,} training rows; "
+          f"curves identical (OOB compared at {int(covered.sum())} fully covered points)")
+    print(f"{'mode':<12} {'trees fitted':>13} {'seconds':>8}")
+    print(f"{'refit':<12} {trees_fitted:>13,} {refit_time:>8.2f}")
+    print(f"{'incremental':<12} {args.max_trees:>13,} {incremental_time:>8.2f}  ({refit_time / incremental_time:.0f}x)")
+    last = {name: values[-1] for name, values in curve.items()}
+    print(f"at {last['n_trees']} trees: train {last['train_accuracy']:.3f}, test {last['test_accuracy']:.3f}, "
+          f"OOB {last['oob_accuracy']:.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Upload ingest time and memory per file format: CSV, Parquet, Feather, Arrow IPC.
+
+Writes scaled-up copies of data/parkinsons.csv (plus a string id column and
+a few non-feature columns, as in a clinic export) in every format to a
+temporary directory. Each file is then ingested in a fresh process the way
+tab2 does it: load the bytes into memory as the uploader would, read the
+feature columns with ingest.read_features and build the model's feature
+matrix. The reported memory is the peak RSS growth over the in-memory
+upload. Predictions are compared across formats. Run from the repository
+root:
+
+    python benchmarks/bench_ingest_formats.py --rows 100000 1000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(ROOT, 'data', 'parkinsons.csv')
+
+PROBE = """
+import hashlib, io, json, resource, sys, time
+import ingest
+from inference import ARTIFACT_PATH, feature_matrix, load_pipeline
+
+pipeline = load_pipeline(ARTIFACT_PATH)
+with open(sys.argv[1], 'rb') as f:
+    upload = io.BytesIO(f.read())
+fmt = ingest.detect_format(sys.argv[1])
+ingest.read_header(upload, fmt)
+
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+before = rss_mb()
+start = time.perf_counter()
+features = feature_matrix(ingest.read_features(upload, fmt))
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({
+    'ingest_ms': elapsed * 1000,
+    'peak_growth_mb': max(peak - before, 0.0),
+    'predictions': hashlib.md5(pipeline.predict(features[:20000]).tobytes()).hexdigest(),
+}))
+"""
+
+
+def make_export(base: pd.DataFrame, n_rows: int) -> pd.DataFrame:
+    df = base.iloc[np.resize(np.arange(len(base)), n_rows)].reset_index(drop=True)
+    df.insert(0, 'name', [f"phon_R01_S{i // 6:05d}_{i % 6 + 1}" for i in range(n_rows)])
+    df['clinic'] = 'Bengaluru'
+    df['recorded_at'] = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.arange(n_rows), unit='s')
+    return df
+
+
+def write_formats(df: pd.DataFrame, directory: str) -> dict:
+    paths = {fmt: os.path.join(directory, f"export.{fmt}") for fmt in ('csv', 'parquet', 'feather', 'arrow')}
+    df.to_csv(paths['csv'], index=False)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, paths['parquet'])
+    feather.write_feather(table, paths['feather'])  # LZ4-compressed Arrow IPC
+    with pa.OSFile(paths['arrow'], 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return paths
+
+
+def probe(path: str) -> dict:
+    out = subprocess.run([sys.executable, '-W', 'ignore', '-c', PROBE, path],
+                         cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    base = pd.read_csv(DATA_PATH)
+    print(f"{'rows':>10} {'format':<8} {'file MB':>8} {'ingest ms':>10} {'peak growth MB':>15}")
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_formats(make_export(base, n_rows), directory)
+            digests = set()
+            for fmt, path in paths.items():
+                runs = [probe(path) for _ in range(args.runs)]
+                digests.update(run['predictions'] for run in runs)
+                print(f"{n_rows:>10,} {fmt:<8} {os.path.getsize(path) / 2**20:>8.1f} "
+                      f"{np.median([run['ingest_ms'] for run in runs]):>10.1f} "
+                      f"{np.median([run['peak_growth_mb'] for run in runs]):>15.1f}")
+            if len(digests) != 1:
+                print(f"Predictions differ between formats for {n_rows} rows", file=sys.stderr)
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Indexed LocationManager lookups vs. the previous linear list scans.
+
+Builds a synthetic registry of 100k centers (repeating the built-in ones
+with unique names, spread over many areas, cities and states) and times
+name, area and multi-filter lookups. Run from the repository root:
+
+    python benchmarks/bench_location_index.py --centers 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from locations import CENTERS_KEY, LocationManager  # noqa: E402
+
+REPEATS = 50
+
+
+def synthetic_registry(n_centers: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    base = list(LocationManager().get_all_centers())
+    states = [f"State {i}" for i in range(36)]
+    centers = []
+    for i in range(n_centers):
+        center = dict(base[i % len(base)])
+        city = int(rng.integers(0, 2_000))
+        center.update(
+            name=f"{center['name']} #{i}",
+            area=f"Area {int(rng.integers(0, 20_000))}",
+            city=f"City {city}",
+            state=states[city % len(states)],
+        )
+        centers.append(center)
+    return {CENTERS_KEY: centers}
+
+
+# The list scans LocationManager used before it kept indexes
+def scan_by_name(data, name):
+    return next((center for center in data[CENTERS_KEY] if center['name'] == name), None)
+
+
+def scan_area(data, area):
+    return [center for center in data[CENTERS_KEY] if center['area'] == area]
+
+
+def scan_filter(data, city, specialty):
+    return [center for center in data[CENTERS_KEY] if center['city'] == city and specialty in center['specialties']]
+
+
+def scan_areas(data):
+    return list(set(center['area'] for center in data[CENTERS_KEY]))
+
+
+def median_ms(fn, *args) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--centers', type=int, default=100_000)
+    args = parser.parse_args()
+
+    data = synthetic_registry(args.centers)
+    start = time.perf_counter()
+    manager = LocationManager(data)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    target = data[CENTERS_KEY][-1]
+    queries = [
+        ('get_center_by_name', lambda: scan_by_name(data, target['name']),
+         lambda: manager.get_center_by_name(target['name'])),
+        ('get_centers_in_area', lambda: scan_area(data, target['area']),
+         lambda: manager.get_centers_in_area(target['area'])),
+        ('city + specialty filter', lambda: scan_filter(data, target['city'], 'DBS Surgery'),
+         lambda: manager.find_centers(city=target['city'], specialty='DBS Surgery')),
+        ('list of areas', lambda: scan_areas(data), lambda: manager._extract_areas()),
+    ]
+
+    print(f"{args.centers:,} centers, index build {build_ms:.0f} ms")
+    print(f"{'query':<24}  {'scan (ms)':>10}  {'index (ms)':>11}  {'speedup':>9}")
+    for name, scan, indexed in queries:
+        scan_result, indexed_result = scan(), indexed()
+        if isinstance(scan_result, list) and name != 'list of areas':
+            assert scan_result == indexed_result, name
+        scan_ms, index_ms = median_ms(scan), median_ms(indexed)
+        print(f"{name:<24}  {scan_ms:>10.3f}  {index_ms:>11.4f}  {scan_ms / index_ms:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
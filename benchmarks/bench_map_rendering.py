@@ -0,0 +1,108 @@
+"""Center map payload size and render time: one folium.Marker per center vs.
+the templated / clustered layer in center_map.py.
+
+Centers are scattered uniformly inside the search radius around the first
+built-in center, so every one of them is drawn. The per-marker map is slow to
+build for big registries, so it is skipped above --legacy-max centers. Run
+from the repository root:
+
+    python benchmarks/bench_map_rendering.py --centers 100 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import folium
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from center_map import KM_PER_DEGREE, create_center_map, render_map_html  # noqa: E402
+from locations import LocationManager  # noqa: E402
+
+
+def synthetic_centers(selected: dict, n_centers: int, radius_km: float, rng) -> list:
+    base = list(LocationManager().get_all_centers())
+    # Uniform over the disc around the selected center
+    distance = radius_km * np.sqrt(rng.uniform(0, 1, n_centers)) / KM_PER_DEGREE
+    angle = rng.uniform(0, 2 * np.pi, n_centers)
+    lat = selected['lat'] + distance * np.sin(angle)
+    lon = selected['lon'] + distance * np.cos(angle) / np.cos(np.radians(selected['lat']))
+    centers = []
+    for i in range(n_centers):
+        center = dict(base[i % len(base)])
+        center.update(name=f"{center['name']} #{i}", lat=float(lat[i]), lon=float(lon[i]))
+        centers.append(center)
+    return centers
+
+
+def legacy_center_map(selected_center: dict, all_centers: list, radius_km: float) -> folium.Map:
+    # The previous app.py implementation: a Marker, Popup, Icon and Tooltip per center
+    m = folium.Map(location=[selected_center['lat'], selected_center['lon']], zoom_start=12,
+                   tiles='OpenStreetMap')
+    for center in [selected_center] + all_centers:
+        folium.Marker(
+            [center['lat'], center['lon']],
+            popup=folium.Popup(
+                f"""
+                <div style='width: 200px'>
+                    <b>{center['name']}</b><br>
+                    {center['address']}<br>
+                    <b>Specialties:</b><br>
+                    {', '.join(center['specialties'])}<br>
+                    📞 {center['phone']}
+                </div>
+                """,
+                max_width=300
+            ),
+            icon=folium.Icon(color='red' if center is selected_center else 'blue', icon='info-sign'),
+            tooltip=center['name']
+        ).add_to(m)
+    folium.Circle([selected_center['lat'], selected_center['lon']], radius=radius_km * 1000,
+                  color='red', fill=True, fillOpacity=0.1).add_to(m)
+    return m
+
+
+def measure(build, repeats: int):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        page = render_map_html(build())
+        best = min(best, time.perf_counter() - start)
+    return len(page.encode('utf-8')), best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--centers', type=int, nargs='+', default=[100, 10_000, 100_000])
+    parser.add_argument('--radius-km', type=float, default=10.0)
+    parser.add_argument('--legacy-max', type=int, default=10_000,
+                        help="Largest registry rendered with one Marker per center")
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    selected = LocationManager().get_all_centers()[0]
+    print(f"{'centers':>8} {'mode':<10} {'markers':>8} {'clusters':>8} {'html KB':>10} {'render ms':>10}")
+    for n_centers in args.centers:
+        centers = synthetic_centers(selected, n_centers, args.radius_km, rng)
+        rows = []
+        if n_centers <= args.legacy_max:
+            size, seconds = measure(lambda: legacy_center_map(selected, centers, args.radius_km),
+                                    1 if n_centers > 1000 else args.repeats)
+            rows.append(('per-marker', n_centers, 0, size, seconds))
+
+        m = create_center_map(selected, centers, args.radius_km)
+        layer = next(child for child in m._children.values() if child._name == 'CenterLayer')
+        size, seconds = measure(lambda: create_center_map(selected, centers, args.radius_km), args.repeats)
+        rows.append(('layer', layer.n_markers, layer.n_clusters, size, seconds))
+
+        for mode, n_markers, n_clusters, size, seconds in rows:
+            print(f"{n_centers:>8,} {mode:<10} {n_markers:>8,} {n_clusters:>8,} {size / 1024:>10.1f} "
+                  f"{seconds * 1000:>10.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
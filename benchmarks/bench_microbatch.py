@@ -0,0 +1,75 @@
+"""Load test: concurrent single-row predictions with and without micro-batching.
+
+Each client thread sends single-row predict_proba requests back to back.
+The unbatched path calls the pipeline once per row; the batched path goes
+through MicroBatcher. Run from the repository root:
+
+    python benchmarks/bench_microbatch.py --clients 32 --requests 200
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import EXPECTED_FEATURES, load_pipeline  # noqa: E402
+from microbatch import MicroBatcher  # noqa: E402
+
+DATA_PATH = 'data/parkinsons.csv'
+
+
+def load_test(call, rows: np.ndarray, clients: int, requests_per_client: int):
+    latencies = [[] for _ in range(clients)]
+
+    def client(i):
+        for j in range(requests_per_client):
+            row = rows[(i * requests_per_client + j) % len(rows)]
+            start = time.perf_counter()
+            call(row)
+            latencies[i].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = np.concatenate(latencies) * 1000
+    return clients * requests_per_client / elapsed, np.percentile(all_latencies, [50, 99])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=200, help="Requests per client")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    pipeline = load_pipeline()
+    rows = pd.read_csv(DATA_PATH)[EXPECTED_FEATURES].to_numpy(dtype=np.float64)
+
+    unbatched_rps, unbatched_lat = load_test(
+        lambda row: pipeline.predict_proba(row[np.newaxis, :]), rows, args.clients, args.requests)
+
+    batcher = MicroBatcher(pipeline.predict_proba, args.max_batch_size, args.max_wait_ms)
+    batched_rps, batched_lat = load_test(batcher.predict, rows, args.clients, args.requests)
+    stats = batcher.stats()
+    batcher.close()
+
+    print(f"{args.clients} clients x {args.requests} single-row requests")
+    print(f"{'path':>10}  {'req/s':>9}  {'p50 ms':>8}  {'p99 ms':>8}")
+    print(f"{'unbatched':>10}  {unbatched_rps:>9,.0f}  {unbatched_lat[0]:>8.2f}  {unbatched_lat[1]:>8.2f}")
+    print(f"{'batched':>10}  {batched_rps:>9,.0f}  {batched_lat[0]:>8.2f}  {batched_lat[1]:>8.2f}")
+    print(f"mean batch size {stats['mean_batch_size']:.1f} over {stats['batches']} model calls")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Scaling of the multi-process scoring engine from 1 to N worker processes.
+
+The synthetic batch resamples rows of data/parkinsons.csv and adds a little
+Gaussian noise (1% of each feature's standard deviation). Run from the
+repository root:
+
+    python benchmarks/bench_parallel_scoring.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import EXPECTED_FEATURES  # noqa: E402
+from scoring_engine import ParallelScorer  # noqa: E402
+
+DATA_PATH = 'data/parkinsons.csv'
+
+
+def synthetic_features(n_rows: int, seed: int = 0) -> np.ndarray:
+    base = pd.read_csv(DATA_PATH)[EXPECTED_FEATURES].to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    rows = base[rng.integers(0, len(base), n_rows)]
+    return rows + rng.normal(0.0, 0.01, rows.shape) * base.std(axis=0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    features = synthetic_features(args.rows)
+    print(f"{args.rows:,} rows, {os.cpu_count()} CPUs visible")
+    print(f"{'workers':>7}  {'seconds':>8}  {'rows/s':>10}  {'speedup':>8}")
+
+    reference = baseline = None
+    for n_workers in range(1, args.max_workers + 1):
+        shard_size = -(-args.rows // (n_workers * 4))
+        with ParallelScorer(n_workers=n_workers, shard_size=shard_size) as scorer:
+            # Warm-up starts the pool and loads the model in every worker
+            scorer.score(features[:shard_size * n_workers])
+            start = time.perf_counter()
+            predictions = scorer.score(features)
+            elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference, baseline = predictions, elapsed
+        assert np.array_equal(predictions, reference), "sharded output differs from single-process output"
+        print(f"{n_workers:>7}  {elapsed:>8.2f}  {args.rows / elapsed:>10,.0f}  {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
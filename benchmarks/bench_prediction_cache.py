@@ -0,0 +1,78 @@
+"""Repeated uploads scored with and without the row-level prediction cache.
+
+Simulates a clinic re-uploading overlapping exports: each upload keeps a
+share of the previous upload's rows (--overlap) and adds new ones. Every
+upload is scored directly with the model and through the PredictionCache,
+optionally with the SQLite tier, and the predictions are compared. Run from
+the repository root:
+
+    python benchmarks/bench_prediction_cache.py --rows 100000 --uploads 5 --overlap 0.8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_scoring import synthetic_features  # noqa: E402
+from inference import ARTIFACT_PATH, load_pipeline  # noqa: E402
+from prediction_cache import PredictionCache, model_version  # noqa: E402
+
+
+def uploads(n_rows: int, n_uploads: int, overlap: float):
+    pool = synthetic_features(n_rows * n_uploads, seed=1)
+    rng = np.random.default_rng(2)
+    current = pool[:n_rows]
+    fresh = n_rows
+    yield current
+    for _ in range(n_uploads - 1):
+        n_new = n_rows - int(n_rows * overlap)
+        kept = current[rng.choice(n_rows, n_rows - n_new, replace=False)]
+        current = rng.permutation(np.vstack([kept, pool[fresh:fresh + n_new]]))
+        fresh += n_new
+        yield current
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--uploads', type=int, default=5)
+    parser.add_argument('--overlap', type=float, default=0.8, help="Share of rows repeated from the last upload")
+    parser.add_argument('--disk', action='store_true', help="Add the SQLite tier")
+    args = parser.parse_args(argv)
+
+    model = load_pipeline(ARTIFACT_PATH)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PredictionCache(model_version(ARTIFACT_PATH),
+                                disk_path=os.path.join(directory, 'predictions.db') if args.disk else None)
+        print(f"{'upload':>6} {'rows':>8} {'model ms':>9} {'cached ms':>10} {'scored rows':>12}")
+        total_model = total_cached = 0.0
+        for i, features in enumerate(uploads(args.rows, args.uploads, args.overlap)):
+            start = time.perf_counter()
+            expected = model.predict_proba(features)
+            model_time = time.perf_counter() - start
+
+            scored_before = cache.stats()['scored_rows']
+            start = time.perf_counter()
+            predictions = cache.predict_proba(model.predict_proba, features)
+            cached_time = time.perf_counter() - start
+
+            if not np.array_equal(predictions, expected):
+                print(f"Cached predictions differ on upload {i + 1}", file=sys.stderr)
+                return 1
+            total_model += model_time
+            total_cached += cached_time
+            print(f"{i + 1:>6} {len(features):>8,} {model_time * 1e3:>9.1f} {cached_time * 1e3:>10.1f} "
+                  f"{cache.stats()['scored_rows'] - scored_before:>12,}")
+        print(f"total: model {total_model:.2f} s, cached {total_cached:.2f} s "
+              f"({total_model / total_cached:.2f}x); {cache.stats()}")
+        cache.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Blocking scoring vs. background prediction jobs.
+
+The old tab2 path scored the whole upload inside the script thread, which
+was blocked until the model returned. With prediction_jobs.JobQueue the
+script only submits the job (the "Make Predictions" click) and then polls.
+The report shows how long the click holds the script thread, the number of
+progress updates a poller sees, the total time to results, and how long a
+fresh queue on the same directory (a restarted server) takes to serve the
+finished job. Results are checked against a direct predict_proba call.
+Run from the repository root:
+
+    python benchmarks/bench_prediction_jobs.py --rows 100000 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_scoring import synthetic_features  # noqa: E402
+from inference import ARTIFACT_PATH, load_pipeline  # noqa: E402
+from prediction_jobs import DEFAULT_CHUNK_ROWS, DONE, JobQueue  # noqa: E402
+
+
+def poll(queue: JobQueue, job: str, interval: float):
+    # Distinct progress values seen, as the app's fragment would show them
+    seen = set()
+    while True:
+        status = queue.status(job)
+        seen.add(status['done_rows'])
+        if status['state'] not in ('queued', 'running'):
+            return status, len(seen)
+        time.sleep(interval)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--poll', type=float, default=0.1, help="Seconds between status polls")
+    args = parser.parse_args(argv)
+
+    model = load_pipeline(ARTIFACT_PATH)
+    print(f"{'rows':>9} {'blocking ms':>12} {'submit ms':>10} {'updates':>8} {'job ms':>8} {'restart ms':>11}")
+    for n_rows in args.rows:
+        features = synthetic_features(n_rows, seed=4)
+        start = time.perf_counter()
+        expected = model.predict_proba(features)
+        blocking_time = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as directory:
+            queue = JobQueue(model.predict_proba, directory, chunk_rows=args.chunk_rows)
+            start = time.perf_counter()
+            job = queue.submit(f"bench-{n_rows}", features)
+            submit_time = time.perf_counter() - start
+            status, updates = poll(queue, job, args.poll)
+            job_time = time.perf_counter() - start
+            queue.close()
+            if status['state'] != DONE or not np.array_equal(queue.result(job), expected):
+                print(f"Job results differ for {n_rows} rows: {status}", file=sys.stderr)
+                return 1
+
+            # A new queue (restarted server) finds the finished job on disk
+            restarted = JobQueue(model.predict_proba, directory, chunk_rows=args.chunk_rows)
+            start = time.perf_counter()
+            job = restarted.submit(f"bench-{n_rows}", features)
+            reused = restarted.result(job)
+            restart_time = time.perf_counter() - start
+            restarted.close()
+            if not np.array_equal(reused, expected):
+                print(f"Reused results differ for {n_rows} rows", file=sys.stderr)
+                return 1
+            del reused
+
+        print(f"{n_rows:>9,} {blocking_time * 1e3:>12.0f} {submit_time * 1e3:>10.1f} {updates:>8} "
+              f"{job_time * 1e3:>8.0f} {restart_time * 1e3:>11.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
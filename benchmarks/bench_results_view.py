@@ -0,0 +1,93 @@
+"""Prediction results view: full table vs. one server-side page.
+
+The old tab2 path built the whole results DataFrame, sent it to
+st.dataframe, ran value_counts for the bar chart and two more passes for the
+metric cards. The new path builds one page with results_view.page_frame and
+takes every count from a single bincount (results_view.summarize). The
+browser payload is measured as the Arrow bytes Streamlit serializes for
+st.dataframe. The CSV download is timed separately since it only runs when
+requested, and its parsed contents are checked against the full table. Run
+from the repository root:
+
+    python benchmarks/bench_results_view.py --rows 10000 1000000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import results_view  # noqa: E402
+
+
+def full_table(predictions: np.ndarray, probabilities: np.ndarray):
+    results_df = pd.DataFrame({
+        'Row': np.arange(1, len(predictions) + 1),
+        'Prediction': np.where(predictions == 1, results_view.POSITIVE_LABEL, results_view.NEGATIVE_LABEL),
+        'Probability': np.round(probabilities, 3),
+    })
+    payload = convert_pandas_df_to_arrow_bytes(results_df)
+    counts = results_df['Prediction'].value_counts()
+    summary = {
+        'total': len(predictions),
+        'positive': int(np.sum(predictions == 1)),
+        'negative': int(np.sum(predictions == 0)),
+    }
+    return payload, summary, counts
+
+
+def paged(predictions: np.ndarray, probabilities: np.ndarray, page_size: int):
+    summary = results_view.summarize(predictions)
+    payload = convert_pandas_df_to_arrow_bytes(results_view.page_frame(predictions, probabilities, 1, page_size))
+    return payload, summary
+
+
+def timed(fn, *args, repeats: int):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--page-size', type=int, default=results_view.DEFAULT_PAGE_SIZE)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>9} {'full ms':>8} {'full KB':>9} {'paged ms':>9} {'paged KB':>9} {'speedup':>8} {'csv ms':>8} {'csv MB':>7}")
+    for n_rows in args.rows:
+        rng = np.random.default_rng(0)
+        probabilities = rng.random(n_rows)
+        predictions = (probabilities > 0.5).astype(np.int64)
+
+        (full_payload, full_summary, counts), full_time = timed(
+            full_table, predictions, probabilities, repeats=args.repeats)
+        (page_payload, summary), page_time = timed(
+            paged, predictions, probabilities, args.page_size, repeats=args.repeats)
+        if summary != full_summary or summary['positive'] != counts.get(results_view.POSITIVE_LABEL, 0):
+            print(f"Summary differs for {n_rows} rows", file=sys.stderr)
+            return 1
+
+        csv, csv_time = timed(results_view.to_csv, predictions, probabilities, repeats=1)
+        expected = results_view._frame(predictions, probabilities, 0, decimals=6)
+        if not pd.read_csv(io.BytesIO(csv)).equals(expected):
+            print(f"Chunked CSV differs for {n_rows} rows", file=sys.stderr)
+            return 1
+        print(f"{n_rows:>9,} {full_time * 1e3:>8.1f} {len(full_payload) / 1024:>9.1f} {page_time * 1e3:>9.2f} "
+              f"{len(page_payload) / 1024:>9.1f} {full_time / page_time:>7.0f}x {csv_time * 1e3:>8.0f} "
+              f"{len(csv) / 2**20:>7.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
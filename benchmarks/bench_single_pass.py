@@ -0,0 +1,95 @@
+"""Class + probability output: predict then predict_proba vs. one predict_proba pass.
+
+The old tab2 path called predict, mapped labels to strings in a list
+comprehension, and needed a second predict_proba call for risk scores. The
+new path runs predict_proba once, derives the classes with
+inference.classify and builds the strings with np.where. Model passes are
+counted by wrapping each model's predict_proba, which predict also goes
+through. Models: the shipped .pdm artifact and a compiled random forest
+(fitted as in bench_tree_kernel.py). Run from the repository root:
+
+    python benchmarks/bench_single_pass.py --rows 1000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_scoring import synthetic_features  # noqa: E402
+from bench_tree_kernel import candidates, training_data  # noqa: E402
+from inference import ARTIFACT_PATH, classify, load_pipeline  # noqa: E402
+from tree_kernel import compile_forest  # noqa: E402
+
+POSITIVE, NEGATIVE = "Has Parkinson's Disease", "Does not have Parkinson's Disease"
+
+
+def count_passes(model):
+    # Counts predict_proba calls on this instance, including the one inside predict
+    original = model.predict_proba
+    model.passes = 0
+
+    def predict_proba(X):
+        model.passes += 1
+        return original(X)
+
+    model.predict_proba = predict_proba
+    return model
+
+
+def two_pass(model, X):
+    predictions = model.predict(X)
+    labels = [POSITIVE if pred == 1 else NEGATIVE for pred in predictions]
+    probabilities = model.predict_proba(X)[:, -1]
+    return predictions, labels, probabilities
+
+
+def single_pass(model, X):
+    proba = model.predict_proba(X)
+    predictions = classify(proba, model.classes_)
+    labels = np.where(predictions == 1, POSITIVE, NEGATIVE)
+    return predictions, labels, proba[:, -1]
+
+
+def timed(fn, model, X, repeats: int):
+    best = float('inf')
+    for _ in range(repeats):
+        model.passes = 0
+        start = time.perf_counter()
+        result = fn(model, X)
+        best = min(best, time.perf_counter() - start)
+    return result, best, model.passes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    X_train, y_train = training_data()
+    models = {'knn (.pdm)': load_pipeline(ARTIFACT_PATH)}
+    forest = next(estimator for name, estimator in candidates(X_train, y_train) if name == 'RandomForest')
+    models['forest (compiled)'] = compile_forest(forest)
+
+    print(f"{'model':<18} {'rows':>8} {'two-pass ms':>12} {'passes':>7} {'single ms':>10} {'passes':>7} {'speedup':>8}")
+    for name, model in models.items():
+        count_passes(model)
+        for n_rows in args.rows:
+            X = synthetic_features(n_rows, seed=3)
+            (old_pred, old_labels, old_proba), old_time, old_passes = timed(two_pass, model, X, args.repeats)
+            (new_pred, new_labels, new_proba), new_time, new_passes = timed(single_pass, model, X, args.repeats)
+            if not (np.array_equal(old_pred, new_pred) and list(new_labels) == old_labels
+                    and np.array_equal(old_proba, new_proba)):
+                print(f"{name}: single-pass output differs for {n_rows} rows", file=sys.stderr)
+                return 1
+            print(f"{name:<18} {n_rows:>8,} {old_time * 1e3:>12.1f} {old_passes:>7} {new_time * 1e3:>10.1f} "
+                  f"{new_passes:>7} {old_time / new_time:>7.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
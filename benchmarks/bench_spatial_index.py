@@ -0,0 +1,100 @@
+"""Spatial index (k-d tree on unit vectors) vs. brute-force haversine.
+
+Builds a synthetic registry of centers scattered over India's bounding box
+and times nearest-k and within-radius queries for a batch of patient
+locations, checking that both methods return the same centers. Run from the
+repository root:
+
+    python benchmarks/bench_spatial_index.py --centers 100000 --queries 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from locations import CENTERS_KEY, LocationManager, haversine_km  # noqa: E402
+
+LAT_RANGE, LON_RANGE = (8.0, 35.0), (68.0, 97.0)
+
+
+def synthetic_registry(n_centers: int, rng) -> dict:
+    base = list(LocationManager().get_all_centers())
+    lat = rng.uniform(*LAT_RANGE, n_centers)
+    lon = rng.uniform(*LON_RANGE, n_centers)
+    centers = []
+    for i in range(n_centers):
+        center = dict(base[i % len(base)])
+        center.update(name=f"{center['name']} #{i}", lat=float(lat[i]), lon=float(lon[i]))
+        centers.append(center)
+    return {CENTERS_KEY: centers}
+
+
+def brute_nearest(lat, lon, q_lat, q_lon, k, block=100):
+    all_d, all_rows = [], []
+    for i in range(0, len(q_lat), block):
+        distances = haversine_km(q_lat[i:i + block, None], q_lon[i:i + block, None], lat[None, :], lon[None, :])
+        rows = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        nearest = np.take_along_axis(distances, rows, axis=1)
+        order = np.argsort(nearest, axis=1)
+        all_d.append(np.take_along_axis(nearest, order, axis=1))
+        all_rows.append(np.take_along_axis(rows, order, axis=1))
+    return np.concatenate(all_d), np.concatenate(all_rows)
+
+
+def brute_radius(lat, lon, q_lat, q_lon, radius_km):
+    results = []
+    for qa, qo in zip(q_lat, q_lon):
+        distances = haversine_km(qa, qo, lat, lon)
+        rows = np.flatnonzero(distances <= radius_km)
+        results.append(rows[np.argsort(distances[rows], kind='stable')])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--centers', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=1_000)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--radius-km', type=float, default=25.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    manager = LocationManager(synthetic_registry(args.centers, rng))
+    centers = manager.get_all_centers()
+    lat = np.array([center['lat'] for center in centers])
+    lon = np.array([center['lon'] for center in centers])
+    q_lat, q_lon = rng.uniform(*LAT_RANGE, args.queries), rng.uniform(*LON_RANGE, args.queries)
+
+    start = time.perf_counter()
+    manager.query_nearest(q_lat[:1], q_lon[:1])
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"{args.centers:,} centers, {args.queries:,} queries; index build {build_ms:.0f} ms")
+
+    start = time.perf_counter()
+    brute_d, brute_rows = brute_nearest(lat, lon, q_lat, q_lon, args.k)
+    brute_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    index_d, index_rows = manager.query_nearest(q_lat, q_lon, args.k)
+    index_ms = (time.perf_counter() - start) * 1000
+    assert np.allclose(brute_d, index_d, atol=1e-6), "nearest-k distances differ"
+    print(f"nearest-{args.k:<3}        brute {brute_ms:9.1f} ms   index {index_ms:8.1f} ms   "
+          f"{brute_ms / index_ms:6.0f}x")
+
+    start = time.perf_counter()
+    brute = brute_radius(lat, lon, q_lat, q_lon, args.radius_km)
+    brute_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    indexed = manager.query_radius(q_lat, q_lon, args.radius_km)
+    index_ms = (time.perf_counter() - start) * 1000
+    assert all(set(b) == set(rows) for b, (_, rows) in zip(brute, indexed)), "radius results differ"
+    hits = sum(len(rows) for _, rows in indexed) / args.queries
+    print(f"within {args.radius_km:g} km       brute {brute_ms:9.1f} ms   index {index_ms:8.1f} ms   "
+          f"{brute_ms / index_ms:6.0f}x   ({hits:.1f} centers/query)")
+
+
+if __name__ == '__main__':
+    main()
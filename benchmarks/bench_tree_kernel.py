@@ -0,0 +1,91 @@
+"""Compiled NumPy tree kernel vs. sklearn/xgboost predict, per batch size.
+
+data/parkinsons.csv carries no status column, so the ensembles are fitted on
+the shipped pipeline's predictions for a noisy resample of the dataset. The
+script first checks that the compiled kernel reproduces the estimators'
+predictions, then times both paths. It also times the kernel as returned by
+compile_forest, which hands batches of LIBRARY_MIN_ROWS or more to the
+estimator. Run from the repository root:
+
+    python benchmarks/bench_tree_kernel.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import EXPECTED_FEATURES, load_pipeline  # noqa: E402
+from tree_kernel import LIBRARY_MIN_ROWS, compile_forest, load_compiled  # noqa: E402
+
+DATA_PATH = 'data/parkinsons.csv'
+BATCH_SIZES = [1, 10, 50, 100, 500, 1_000, 10_000]
+REPEATS = 20
+
+
+def training_data(n_rows: int = 2_000, seed: int = 0):
+    base = pd.read_csv(DATA_PATH)[EXPECTED_FEATURES].to_numpy(dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    X = base[rng.integers(0, len(base), n_rows)]
+    X = X + rng.normal(0.0, 0.05, X.shape) * base.std(axis=0)
+    return X, load_pipeline().predict(X)
+
+
+def median_time(fn, X) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def candidates(X, y):
+    yield 'RandomForest', Pipeline([
+        ('scaler', MinMaxScaler()),
+        ('model', RandomForestClassifier(n_estimators=100, random_state=0)),
+    ]).fit(X, y)
+    try:
+        from xgboost import XGBClassifier
+    except ImportError:
+        return
+    yield 'XGBoost', Pipeline([
+        ('scaler', MinMaxScaler()),
+        ('model', XGBClassifier(n_estimators=100, max_depth=6, learning_rate=0.1)),
+    ]).fit(X, y)
+
+
+def main():
+    X, y = training_data()
+    X_eval = training_data(max(BATCH_SIZES), seed=1)[0]
+
+    for name, estimator in candidates(X, y):
+        compiled = compile_forest(estimator)
+        # Saved without its source pickle, so the loaded kernel always traverses the trees
+        compiled.save('/tmp/bench_forest.npz')
+        dispatched, compiled = compiled, load_compiled('/tmp/bench_forest.npz')
+
+        assert np.array_equal(compiled.predict(X_eval), estimator.predict(X_eval)), f"{name}: labels differ"
+        proba_diff = np.abs(compiled.predict_proba(X_eval) - estimator.predict_proba(X_eval)).max()
+        print(f"\n{name}: {compiled.n_trees} trees, depth {compiled.max_depth}; "
+              f"labels identical, max |proba diff| = {proba_diff:.2e}")
+
+        print(f"estimator used from {LIBRARY_MIN_ROWS[compiled.kind]} rows")
+        print(f"{'batch':>7}  {'estimator (ms)':>15}  {'kernel (ms)':>12}  {'speedup':>8}  {'dispatched (ms)':>16}")
+        for batch_size in BATCH_SIZES:
+            batch = X_eval[:batch_size]
+            reference = median_time(estimator.predict_proba, batch)
+            kernel = median_time(compiled.predict_proba, batch)
+            both = median_time(dispatched.predict_proba, batch)
+            print(f"{batch_size:>7}  {reference * 1e3:>15.3f}  {kernel * 1e3:>12.3f}  {reference / kernel:>7.2f}x  "
+                  f"{both * 1e3:>16.3f}")
+
+
+if __name__ == '__main__':
+    main()
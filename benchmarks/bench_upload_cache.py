@@ -0,0 +1,98 @@
+"""Reruns of the prediction tab with and without the shared parsed-upload cache.
+
+Each simulated session uploads one CSV (data/parkinsons.csv repeated to
+--rows) and then reruns the script --reruns times, as Streamlit does on
+every widget change and on the "Make Predictions" click. Without the cache
+every rerun parses the file again. With it, only the first run parses.
+--files distinct uploads are cycled through a cache capped at --max-entries
+and --max-mb, and the report shows the per-rerun time, the cache's peak
+bytes and the peak traced memory. Run from the repository root:
+
+    python benchmarks/bench_upload_cache.py --rows 200000 --files 4 --max-entries 2 --max-mb 64
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ingest  # noqa: E402
+from inference import feature_matrix  # noqa: E402
+from upload_cache import UploadCache  # noqa: E402
+
+DATA_PATH = 'data/parkinsons.csv'
+
+
+def make_uploads(n_rows: int, n_files: int):
+    base = pd.read_csv(DATA_PATH)
+    uploads = []
+    for i in range(n_files):
+        df = base.iloc[np.resize(np.arange(len(base)), n_rows)].reset_index(drop=True)
+        # Distinct content per file
+        df['MDVP:Fo(Hz)'] += i
+        uploads.append(io.BytesIO(df.to_csv(index=False).encode('utf-8')))
+    return uploads
+
+
+def parse(upload: io.BytesIO) -> np.ndarray:
+    return feature_matrix(ingest.read_features(upload))
+
+
+def run_sessions(uploads, reruns: int, cache):
+    tracemalloc.start()
+    start = time.perf_counter()
+    checksum = 0.0
+    for upload in uploads:
+        for _ in range(reruns):
+            if cache is None:
+                features = parse(upload)
+            else:
+                key = ingest.upload_digest(upload)
+                features = cache.get(key)
+                if features is None:
+                    features = cache.put(key, parse(upload))
+            checksum += float(features[:, 0].sum())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, checksum
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--files', type=int, default=4)
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--max-entries', type=int, default=2)
+    parser.add_argument('--max-mb', type=float, default=64)
+    args = parser.parse_args(argv)
+
+    uploads = make_uploads(args.rows, args.files)
+    runs = args.files * args.reruns
+    legacy_time, legacy_peak, legacy_sum = run_sessions(uploads, args.reruns, None)
+    cache = UploadCache(args.max_entries, int(args.max_mb * 2**20))
+    cached_time, cached_peak, cached_sum = run_sessions(uploads, args.reruns, cache)
+    if legacy_sum != cached_sum:
+        print("Cached features differ from a fresh parse", file=sys.stderr)
+        return 1
+
+    stats = cache.stats()
+    matrix_mb = args.rows * 22 * 8 / 2**20
+    print(f"{args.files} uploads x {args.reruns} reruns, {args.rows:,} rows ({matrix_mb:.1f} MB feature matrix each)")
+    print(f"{'mode':<8} {'ms/rerun':>9} {'peak traced MB':>15}")
+    print(f"{'parse':<8} {legacy_time / runs * 1e3:>9.1f} {legacy_peak / 2**20:>15.1f}")
+    print(f"{'cached':<8} {cached_time / runs * 1e3:>9.1f} {cached_peak / 2**20:>15.1f}")
+    print(f"cache: {stats['entries']} entries, {stats['bytes'] / 2**20:.1f} MB, peak {stats['peak_bytes'] / 2**20:.1f} MB "
+          f"(limits {args.max_entries} entries / {args.max_mb:.0f} MB), {stats['hits']} hits, "
+          f"{stats['misses']} misses, {stats['evictions']} evictions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Upload ingest: one full read_csv vs. the staged header / preview / feature passes.
+
+Builds in-memory CSV uploads by repeating data/parkinsons.csv (plus a string
+id column, as in the original UCI export) and reports the time until the
+header is validated and the preview is ready, the time of the full parse,
+and the peak memory traced during it. The predictions from both parses are
+compared. Run from the repository root:
+
+    python benchmarks/bench_upload_ingest.py --rows 10000 100000 500000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ingest  # noqa: E402
+from inference import ARTIFACT_PATH, feature_matrix, load_pipeline, missing_features  # noqa: E402
+
+DATA_PATH = 'data/parkinsons.csv'
+
+
+def make_upload(base: pd.DataFrame, n_rows: int) -> io.BytesIO:
+    df = base.iloc[np.resize(np.arange(len(base)), n_rows)].reset_index(drop=True)
+    df.insert(0, 'name', [f"phon_R01_S{i // 6:05d}_{i % 6 + 1}" for i in range(n_rows)])
+    return io.BytesIO(df.to_csv(index=False).encode('utf-8'))
+
+
+def traced(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def legacy_ingest(upload: io.BytesIO) -> pd.DataFrame:
+    # What tab2 used to do before showing anything
+    upload.seek(0)
+    df = pd.read_csv(upload)
+    df.head()
+    missing_features(df.columns)
+    return df
+
+
+def staged_feedback(upload: io.BytesIO) -> pd.DataFrame:
+    missing_features(ingest.read_header(upload))
+    return ingest.read_preview(upload)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 500_000])
+    args = parser.parse_args(argv)
+
+    base = pd.read_csv(DATA_PATH)
+    pipeline = load_pipeline(ARTIFACT_PATH)
+    # The legacy path parses the whole file before any feedback, so one time covers both
+    print(f"{'rows':>8} {'upload MB':>10} {'legacy ms':>10} {'staged feedback ms':>19} "
+          f"{'staged parse ms':>16} {'legacy peak MB':>15} {'staged peak MB':>15}")
+    for n_rows in args.rows:
+        upload = make_upload(base, n_rows)
+        legacy_df, legacy_time, legacy_peak = traced(legacy_ingest, upload)
+        _, feedback_time, _ = traced(staged_feedback, upload)
+        staged_df, parse_time, staged_peak = traced(ingest.read_features, upload)
+
+        if not np.array_equal(pipeline.predict(feature_matrix(legacy_df)),
+                              pipeline.predict(feature_matrix(staged_df))):
+            print(f"Predictions differ for {n_rows} rows", file=sys.stderr)
+            return 1
+        print(f"{n_rows:>8,} {upload.getbuffer().nbytes / 2**20:>10.1f} {legacy_time * 1e3:>10.1f} "
+              f"{feedback_time * 1e3:>19.1f} {parse_time * 1e3:>16.1f} "
+              f"{legacy_peak / 2**20:>15.1f} {staged_peak / 2**20:>15.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Per-upload latency: refitting MinMaxScaler on every upload vs. the bundled pipeline.
+
+Run from the repository root:
+
+    python benchmarks/bench_upload_latency.py
+"""
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import EXPECTED_FEATURES, MODEL_PATH, load_pipeline, predict  # noqa: E402
+
+DATA_PATH = 'data/parkinsons.csv'
+UPLOAD_SIZES = [1, 10, 195, 10_000]
+REPEATS = 20
+
+
+def make_upload(base: pd.DataFrame, n_rows: int) -> pd.DataFrame:
+    idx = np.resize(np.arange(len(base)), n_rows)
+    return base.iloc[idx].reset_index(drop=True)
+
+
+def legacy_path(model, df: pd.DataFrame) -> np.ndarray:
+    # What tab2 used to do on every upload
+    scaler = MinMaxScaler()
+    scaled_features = scaler.fit_transform(df[EXPECTED_FEATURES])
+    return model.predict(scaled_features)
+
+
+def time_call(fn, *args) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main():
+    base = pd.read_csv(DATA_PATH)
+    with open(MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+    pipeline = load_pipeline()
+
+    print(f"{'rows':>8}  {'refit scaler (ms)':>18}  {'pipeline (ms)':>14}  {'speedup':>8}")
+    for n_rows in UPLOAD_SIZES:
+        df = make_upload(base, n_rows)
+        legacy = time_call(legacy_path, model, df)
+        bundled = time_call(predict, pipeline, df)
+        print(f"{n_rows:>8}  {legacy * 1e3:>18.3f}  {bundled * 1e3:>14.3f}  {legacy / bundled:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Cold-start regression check for app.py.
+
+Runs the app once in a fresh interpreter (Streamlit's AppTest, profiling
+enabled) and fails if the first full script run exceeds the time budget or
+if modules that should stay out of startup (the sklearn/xgboost training
+stack) were imported. Run from the repository root:
+
+    python benchmarks/check_cold_start.py --budget-ms 3000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORBIDDEN_MODULES = ['sklearn', 'xgboost', 'imblearn']
+
+PROBE = """
+import json, os, sys, time, warnings
+warnings.filterwarnings('ignore')
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(os.path.join(os.getcwd(), 'app.py'), default_timeout=120).run()
+elapsed = time.perf_counter() - start
+import startup_profile
+print(json.dumps({
+    'first_run_ms': elapsed * 1000,
+    'exceptions': [str(e.value) for e in at.exception],
+    'timings': startup_profile.timings(),
+    'modules': sorted(name for name in sys.modules if '.' not in name),
+}))
+"""
+
+
+def probe() -> dict:
+    env = dict(os.environ, PD_PROFILE_STARTUP='1')
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('PD_COLD_START_BUDGET_MS', 3000)))
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [probe() for _ in range(args.runs)]
+    first_run_ms = float(np.median([run['first_run_ms'] for run in runs]))
+
+    for kind, name, ms in runs[-1]['timings']:
+        print(f"{kind:<6} {name:<40} {ms:9.1f} ms")
+    print(f"first script run (median of {args.runs}): {first_run_ms:.0f} ms, budget {args.budget_ms:.0f} ms")
+
+    failures = []
+    if any(run['exceptions'] for run in runs):
+        failures.append(f"app raised: {runs[-1]['exceptions']}")
+    if first_run_ms > args.budget_ms:
+        failures.append(f"cold start {first_run_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+    imported = sorted(set(FORBIDDEN_MODULES) & set(runs[-1]['modules']))
+    if imported:
+        failures.append(f"startup imported {', '.join(imported)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
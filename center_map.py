@@ -0,0 +1,156 @@
+"""Folium map of treatment centers that stays small for large registries.
+
+Only the centers passed in (the ones inside the search radius) are drawn, and
+the map is fitted to that radius. Their data goes into the page as one
+compact JSON array. A single script creates the markers with one shared
+icon, and popup HTML is built from a single template when a marker is
+clicked. Above ``MAX_MARKERS`` the centers are clustered on a lat/lon grid
+server-side and each occupied cell is drawn as one count marker.
+"""
+import html
+import json
+import math
+from typing import Dict, List, Tuple
+
+import folium
+import numpy as np
+from branca.element import MacroElement
+from jinja2 import Template
+
+# Above this many centers, markers are merged into grid clusters
+MAX_MARKERS = 500
+
+# Grid cells across the diameter of the search radius when clustering
+CLUSTER_GRID = 24
+
+KM_PER_DEGREE = 111.32
+
+
+class CenterLayer(MacroElement):
+    # Markers and cluster markers for many centers, drawn by one script
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this._parent.get_name() }};
+            var icon = L.AwesomeMarkers.icon({icon: 'info-sign', markerColor: 'blue', prefix: 'glyphicon'});
+            var popup = function(c) {
+                return "<div style='width: 200px'><b>" + c[2] + "</b><br>" + c[3]
+                    + "<br><b>Specialties:</b><br>" + c[4] + "<br>\\ud83d\\udcde " + c[5] + "</div>";
+            };
+            {{ this.markers }}.forEach(function(c) {
+                L.marker([c[0], c[1]], {icon: icon})
+                    .bindTooltip(c[2])
+                    .bindPopup(function() { return popup(c); }, {maxWidth: 300})
+                    .addTo(map);
+            });
+            {{ this.clusters }}.forEach(function(c) {
+                var size = 24 + 6 * Math.min(5, Math.floor(Math.log10(c[2])));
+                L.marker([c[0], c[1]], {icon: L.divIcon({
+                    html: "<div style='background: rgba(37, 99, 235, 0.75); color: white; border-radius: 50%;"
+                        + " text-align: center; font: bold 11px sans-serif; width: " + size + "px; height: "
+                        + size + "px; line-height: " + size + "px;'>" + c[2] + "</div>",
+                    className: '', iconSize: [size, size]
+                })}).bindTooltip(c[2] + ' centers, narrow the radius to list them').addTo(map);
+            });
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, markers: List[list], clusters: List[list]):
+        super().__init__()
+        self._name = 'CenterLayer'
+        self.n_markers, self.n_clusters = len(markers), len(clusters)
+        self.markers = json.dumps(markers, separators=(',', ':'), ensure_ascii=False)
+        self.clusters = json.dumps(clusters, separators=(',', ':'))
+
+
+def _marker_row(center: Dict) -> list:
+    # Escaped once here; the popup template only concatenates the fields
+    return [
+        round(center['lat'], 6), round(center['lon'], 6), html.escape(center['name']),
+        html.escape(center['address']), html.escape(', '.join(center['specialties'])),
+        html.escape(center['phone']),
+    ]
+
+
+def grid_clusters(lat: np.ndarray, lon: np.ndarray, cell_lat: float,
+                  cell_lon: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Assign every point to a grid cell; returns per-point cell ids and the
+    # centroid and size of every occupied cell
+    cells = np.column_stack([np.floor(lat / cell_lat), np.floor(lon / cell_lon)]).astype(np.int64)
+    _, labels, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    labels = labels.reshape(-1)
+    centroid_lat = np.bincount(labels, weights=lat) / counts
+    centroid_lon = np.bincount(labels, weights=lon) / counts
+    return labels, centroid_lat, centroid_lon, counts
+
+
+def create_center_map(selected_center: Dict, all_centers: List[Dict], radius_km: float = 5,
+                      max_markers: int = MAX_MARKERS) -> folium.Map:
+    m = folium.Map(
+        location=[selected_center['lat'], selected_center['lon']],
+        zoom_start=12,
+        tiles='OpenStreetMap'
+    )
+
+    # Add marker for selected center
+    folium.Marker(
+        [selected_center['lat'], selected_center['lon']],
+        popup=folium.Popup(
+            f"""
+            <div style='width: 200px'>
+                <b>{selected_center['name']}</b><br>
+                {selected_center['address']}<br>
+                <b>Specialties:</b><br>
+                {', '.join(selected_center['specialties'])}<br>
+                📞 {selected_center['phone']}
+            </div>
+            """,
+            max_width=300
+        ),
+        icon=folium.Icon(color='red', icon='info-sign'),
+        tooltip=selected_center['name']
+    ).add_to(m)
+
+    # Add markers (or grid clusters) for the other centers
+    others = [center for center in all_centers if center['name'] != selected_center['name']]
+    markers, clusters = [], []
+    if len(others) <= max_markers:
+        markers = [_marker_row(center) for center in others]
+    else:
+        lat = np.fromiter((center['lat'] for center in others), dtype=np.float64, count=len(others))
+        lon = np.fromiter((center['lon'] for center in others), dtype=np.float64, count=len(others))
+        cell_lat = 2 * radius_km / KM_PER_DEGREE / CLUSTER_GRID
+        cell_lon = cell_lat / max(math.cos(math.radians(selected_center['lat'])), 0.01)
+        labels, centroid_lat, centroid_lon, counts = grid_clusters(lat, lon, cell_lat, cell_lon)
+        # Cells holding a single center keep a normal marker
+        single = counts == 1
+        for i in np.flatnonzero(single[labels]):
+            markers.append(_marker_row(others[i]))
+        clusters = np.column_stack([centroid_lat[~single].round(6), centroid_lon[~single].round(6),
+                                    counts[~single]]).tolist()
+        for cluster in clusters:
+            cluster[2] = int(cluster[2])
+    m.add_child(CenterLayer(markers, clusters))
+
+    # Add coverage radius
+    folium.Circle(
+        [selected_center['lat'], selected_center['lon']],
+        radius=radius_km * 1000,  # Convert km to meters
+        color='red',
+        fill=True,
+        fillOpacity=0.1
+    ).add_to(m)
+
+    # Viewport covers the search radius, so nothing outside it is drawn
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = dlat / max(math.cos(math.radians(selected_center['lat'])), 0.01)
+    m.fit_bounds([[selected_center['lat'] - dlat, selected_center['lon'] - dlon],
+                  [selected_center['lat'] + dlat, selected_center['lon'] + dlon]])
+
+    return m
+
+
+def render_map_html(m: folium.Map) -> str:
+    return folium.Figure().add_child(m).render()
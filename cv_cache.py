@@ -0,0 +1,183 @@
+"""Cross-validation folds prepared once and shared by every candidate model.
+
+Model comparison and grid search fit many estimators on the same CV splits,
+and with the imblearn pipeline every one of those fits oversampled its
+training rows and refitted the MinMaxScaler again. FoldCache does that work
+once per fold: the resampled and scaled training rows, the scaled test rows
+and the fitted scaler are written under a key made of the data digest, the
+split and the preprocessing settings. Workers open the arrays memory-mapped,
+so parallel fits share one copy of the training matrix in the page cache,
+and a later run on the same data reuses the files.
+"""
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from itertools import product
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+
+# Directory used by train.py when no --cv-cache is given
+CACHE_DIR_ENV = 'PD_CV_CACHE'
+
+
+def configured_cache_dir() -> str:
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(tempfile.gettempdir(), 'pd_cv_cache')
+
+
+def data_digest(X: np.ndarray, y: np.ndarray) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for array in (np.ascontiguousarray(X), np.ascontiguousarray(y)):
+        digest.update(f"{array.dtype.str}{array.shape}".encode('utf-8'))
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+def _describe(estimator) -> str:
+    # Stable across processes: callables are named, not shown by address
+    params = sorted((name, getattr(value, '__qualname__', value)) for name, value in estimator.get_params().items())
+    return f"{type(estimator).__name__}{params}"
+
+
+class Fold(NamedTuple):
+    index: int
+    path: str
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # (X_train, y_train, X_test, y_test), read-only and memory-mapped
+        return tuple(np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r')
+                     for name in ('X_train', 'y_train', 'X_test', 'y_test'))
+
+    def scaler(self):
+        with open(os.path.join(self.path, 'scaler.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+
+class FoldCache:
+    def __init__(self, cache_dir: str, cv, sampler, scaler):
+        self.cache_dir = cache_dir
+        self.cv = cv
+        self.sampler = sampler
+        self.scaler = scaler
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def key(self, X: np.ndarray, y: np.ndarray, splits: Sequence[Tuple[np.ndarray, np.ndarray]]) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(data_digest(X, y).encode('utf-8'))
+        digest.update(f"{_describe(self.sampler)}|{_describe(self.scaler)}".encode('utf-8'))
+        for _, test in splits:
+            digest.update(np.asarray(test, dtype=np.int64).tobytes())
+        return digest.hexdigest()
+
+    def folds(self, X: np.ndarray, y: np.ndarray) -> List[Fold]:
+        splits = list(self.cv.split(X, y))
+        root = os.path.join(self.cache_dir, self.key(X, y, splits))
+        os.makedirs(root, exist_ok=True)
+        folds = []
+        for index, (train, test) in enumerate(splits):
+            fold = Fold(index, os.path.join(root, f"fold{index}"))
+            with self._lock:
+                if os.path.exists(fold.path):
+                    self._hits += 1
+                else:
+                    self._misses += 1
+                    self._prepare(X, y, train, test, fold.path)
+            folds.append(fold)
+        return folds
+
+    def _prepare(self, X: np.ndarray, y: np.ndarray, train: np.ndarray, test: np.ndarray, path: str):
+        from sklearn.base import clone
+
+        # Same steps, in the same order, as the sampler and scaler of the pipeline
+        X_train, y_train = clone(self.sampler).fit_resample(X[train], y[train])
+        scaler = clone(self.scaler).fit(X_train)
+        # Written to a temporary directory and renamed, so a fold directory is always complete
+        tmp_path = tempfile.mkdtemp(dir=os.path.dirname(path))
+        try:
+            for name, array in (('X_train', scaler.transform(X_train)), ('y_train', y_train),
+                                ('X_test', scaler.transform(X[test])), ('y_test', y[test])):
+                np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(array))
+            with open(os.path.join(tmp_path, 'scaler.pkl'), 'wb') as f:
+                pickle.dump(scaler, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another process finished the same fold first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            if not os.path.exists(path):
+                raise
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses}
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def _metrics():
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+    return {
+        'accuracy': accuracy_score,
+        'precision': lambda y_true, y_pred: precision_score(y_true, y_pred, zero_division=0),
+        'recall': lambda y_true, y_pred: recall_score(y_true, y_pred, zero_division=0),
+        'f1': lambda y_true, y_pred: f1_score(y_true, y_pred, zero_division=0),
+    }
+
+
+METRICS = ('accuracy', 'precision', 'recall', 'f1')
+
+
+def fit_score(estimator, fold: Fold, metrics: Sequence[str] = METRICS) -> Dict[str, float]:
+    X_train, y_train, X_test, y_test = fold.arrays()
+    y_pred = estimator.fit(X_train, y_train).predict(X_test)
+    scorers = _metrics()
+    return {metric: float(scorers[metric](y_test, y_pred)) for metric in metrics}
+
+
+def cross_validate(estimators: Dict[str, object], folds: List[Fold], n_jobs: int = -1,
+                   metrics: Sequence[str] = METRICS) -> Dict[str, Dict[str, float]]:
+    from joblib import Parallel, delayed
+    from sklearn.base import clone
+
+    # Every (estimator, fold) pair is one task; only the fold's path is sent to the worker
+    names = [name for name in estimators for _ in folds]
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(fit_score)(clone(estimator), fold, metrics) for estimator in estimators.values() for fold in folds)
+    per_fold: Dict[str, List[Dict[str, float]]] = {}
+    for name, fold_scores in zip(names, scores):
+        per_fold.setdefault(name, []).append(fold_scores)
+    return {name: {metric: float(np.mean([s[metric] for s in fold_scores])) for metric in metrics}
+            for name, fold_scores in per_fold.items()}
+
+
+class SearchResult:
+    # The attributes of GridSearchCV that train.py and the benchmarks read;
+    # best_estimator_ is set by the caller, which refits on the unsplit rows
+
+    def __init__(self, params: List[Dict], mean_scores: np.ndarray):
+        self.cv_results_ = {'params': params, 'mean_test_score': mean_scores}
+        # First of the best, as GridSearchCV's rank_test_score picks it
+        self.best_index_ = int(np.argmax(mean_scores))
+        self.best_params_ = params[self.best_index_]
+        self.best_score_ = float(mean_scores[self.best_index_])
+        self.best_estimator_ = None
+
+
+def grid_search(estimator, param_grid: Union[Dict[str, list], List[Dict[str, list]]], folds: List[Fold],
+                n_jobs: int = -1, metric: str = 'accuracy') -> SearchResult:
+    from joblib import Parallel, delayed
+    from sklearn.base import clone
+    from sklearn.model_selection import ParameterGrid
+
+    params = list(ParameterGrid(param_grid))
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(fit_score)(clone(estimator).set_params(**candidate), fold, (metric,))
+        for candidate, fold in product(params, folds))
+    per_candidate = np.array([s[metric] for s in scores]).reshape(len(params), len(folds))
+    return SearchResult(params, per_candidate.mean(axis=1))
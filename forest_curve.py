@@ -0,0 +1,135 @@
+"""Random forest accuracy against the number of trees, from one growing forest.
+
+The notebook refitted the tuned forest from scratch for every point of its
+"Random Forest Accuracy" plot. Here a single RandomForestClassifier is grown
+with warm_start, ``--step`` trees at a time. Each new tree is evaluated once,
+and its class probabilities are added to running sums for the training rows,
+the test rows and the out-of-bag rows of the resampled training set, so the
+whole curve costs about one fit plus one prediction pass. Because warm-start
+trees get the same seeds as a fresh fit, every point equals a forest fitted
+from scratch with that many trees.
+
+The oversampler and scaler run once, as in the training pipeline. OOB
+accuracy is measured on the oversampled rows, so a minority row can be
+out of bag while its duplicate is in the bag, which makes the OOB curve
+somewhat optimistic. The test curve is the unbiased one. A tree's
+out-of-bag rows are recomputed from its seed, drawn the way sklearn draws
+bootstrap samples, rather than through sklearn's private helpers.
+
+    python forest_curve.py data/parkinsons.data --max-trees 200 --step 5 --output rf_curve.csv
+"""
+import argparse
+import sys
+from numbers import Integral
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from train import DATA_PATH, RANDOM_STATE, TEST_SIZE, load_dataset, make_sampler
+
+
+def _n_bootstrap(n_samples: int, max_samples) -> int:
+    # Rows drawn per tree for RandomForestClassifier(max_samples=...)
+    if max_samples is None:
+        return n_samples
+    if isinstance(max_samples, Integral):
+        return int(max_samples)
+    return max(int(max_samples * n_samples), 1)
+
+
+def _unsampled_rows(seed: int, n_samples: int, n_bootstrap: int) -> np.ndarray:
+    # A tree's bootstrap is n_bootstrap draws with replacement from RandomState(tree.random_state);
+    # the rows never drawn are its out-of-bag rows
+    drawn = np.random.RandomState(seed).randint(0, n_samples, n_bootstrap)
+    return np.flatnonzero(np.bincount(drawn, minlength=n_samples) == 0)
+
+
+def forest_curve(X_train: np.ndarray, y_train: np.ndarray, X_test: np.ndarray, y_test: np.ndarray,
+                 max_trees: int = 80, step: int = 1, random_state: int = RANDOM_STATE,
+                 **forest_params) -> Dict[str, np.ndarray]:
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import MinMaxScaler
+
+    if step < 1:
+        raise ValueError(f"step must be at least 1, got {step}")
+    if max_trees < step:
+        raise ValueError(f"max_trees ({max_trees}) must be at least step ({step})")
+
+    X_fit, y_fit = make_sampler(random_state).fit_resample(X_train, y_train)
+    scaler = MinMaxScaler().fit(X_fit)
+    # Trees predict on float32, as the forest itself converts its input
+    X_fit = scaler.transform(X_fit).astype(np.float32)
+    X_train = scaler.transform(X_train).astype(np.float32)
+    X_test = scaler.transform(X_test).astype(np.float32)
+
+    forest = RandomForestClassifier(n_estimators=0, warm_start=True, random_state=random_state, **forest_params)
+    n_classes = len(np.unique(y_fit))
+    train_sum = np.zeros((len(X_train), n_classes))
+    test_sum = np.zeros((len(X_test), n_classes))
+    oob_sum = np.zeros((len(X_fit), n_classes))
+    oob_votes = np.zeros(len(X_fit), dtype=np.int64)
+    n_bootstrap = _n_bootstrap(len(X_fit), forest.max_samples)
+
+    curve: Dict[str, List[float]] = {'n_trees': [], 'train_accuracy': [], 'test_accuracy': [], 'oob_accuracy': []}
+    fitted = 0
+    for n_trees in list(range(step, max_trees, step)) + [max_trees]:
+        forest.set_params(n_estimators=n_trees).fit(X_fit, y_fit)
+        # Only the trees added by this fit are evaluated
+        for tree in forest.estimators_[fitted:]:
+            train_sum += tree.predict_proba(X_train)
+            test_sum += tree.predict_proba(X_test)
+            if forest.bootstrap:
+                unsampled = _unsampled_rows(tree.random_state, len(X_fit), n_bootstrap)
+                oob_sum[unsampled] += tree.predict_proba(X_fit[unsampled])
+                oob_votes[unsampled] += 1
+        fitted = n_trees
+
+        # Same averaging as RandomForestClassifier.predict_proba and its OOB decision function
+        classes = forest.classes_
+        curve['n_trees'].append(n_trees)
+        curve['train_accuracy'].append(float(np.mean(classes[(train_sum / n_trees).argmax(axis=1)] == y_train)))
+        curve['test_accuracy'].append(float(np.mean(classes[(test_sum / n_trees).argmax(axis=1)] == y_test)))
+        # Rows that no tree has left out yet have no OOB prediction and are not counted
+        voted = oob_votes > 0
+        oob_pred = classes[(oob_sum[voted] / oob_votes[voted, np.newaxis]).argmax(axis=1)]
+        curve['oob_accuracy'].append(float(np.mean(oob_pred == y_fit[voted])) if voted.any() else float('nan'))
+    return {name: np.asarray(values) for name, values in curve.items()}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Random forest train/test/OOB accuracy against the number of trees.")
+    parser.add_argument('data', nargs='?', default=DATA_PATH, help="CSV with the voice features and a 'status' column")
+    parser.add_argument('--max-trees', type=int, default=80)
+    parser.add_argument('--step', type=int, default=1, help="Trees added between points of the curve")
+    parser.add_argument('--max-depth', type=int)
+    parser.add_argument('--min-samples-split', type=int, default=2)
+    parser.add_argument('--min-samples-leaf', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE)
+    parser.add_argument('--output', help="CSV file for the curve (default: print it)")
+    args = parser.parse_args(argv)
+
+    try:
+        import pandas as pd
+        from sklearn.model_selection import train_test_split
+
+        X, y = load_dataset(args.data)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=TEST_SIZE, stratify=y, random_state=args.seed)
+        curve = pd.DataFrame(forest_curve(
+            X_train, y_train, X_test, y_test, args.max_trees, args.step, args.seed, max_depth=args.max_depth,
+            min_samples_split=args.min_samples_split, min_samples_leaf=args.min_samples_leaf,
+        ))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.output:
+        curve.to_csv(args.output, index=False)
+        print(f"Wrote {len(curve)} points to {args.output}", file=sys.stderr)
+    else:
+        print(curve.to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+# gunicorn settings for the prediction API: gunicorn -c gunicorn.conf.py api:app
+import multiprocessing
+import os
+
+bind = os.environ.get('PD_API_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('PD_API_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Several threads per worker let concurrent single-row requests share one model call
+threads = int(os.environ.get('PD_API_THREADS', 8))
+
+# Import api.py (and unpickle the model) once in the master before forking workers
+preload_app = True
+
+timeout = 30
+keepalive = 5
@@ -0,0 +1,92 @@
+import os
+import pickle
+from typing import TYPE_CHECKING, List, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Feature columns in the order the model was trained on
+EXPECTED_FEATURES = [
+    'MDVP:Fo(Hz)', 'MDVP:Fhi(Hz)', 'MDVP:Flo(Hz)', 'MDVP:Jitter(%)',
+    'MDVP:Jitter(Abs)', 'MDVP:RAP', 'MDVP:PPQ', 'Jitter:DDP',
+    'MDVP:Shimmer', 'MDVP:Shimmer(dB)', 'Shimmer:APQ3', 'Shimmer:APQ5',
+    'MDVP:APQ', 'Shimmer:DDA', 'NHR', 'HNR', 'RPDE', 'DFA',
+    'spread1', 'spread2', 'D2', 'PPE'
+]
+
+# Bare classifier written by the notebook (expects already-scaled features)
+MODEL_PATH = 'parkinson_classifier_model.pkl'
+
+# Training-time MinMaxScaler + classifier bundled as one sklearn Pipeline
+PIPELINE_PATH = 'parkinson_pipeline.pkl'
+
+# The same pipeline converted to the memory-mapped .pdm format (model_artifact.py)
+ARTIFACT_PATH = 'parkinson_model.pdm'
+
+# Overrides the model file used by the app, the API and the batch tools
+MODEL_PATH_ENV = 'PD_MODEL_PATH'
+
+
+def configured_model_path() -> str:
+    return os.environ.get(MODEL_PATH_ENV, ARTIFACT_PATH)
+
+
+def load_pipeline(path: str = PIPELINE_PATH):
+    # .pdm artifacts and compiled tree kernels load with NumPy alone, without sklearn/xgboost
+    if path.endswith('.pdm'):
+        from model_artifact import load_artifact
+        return load_artifact(path)
+    if path.endswith('.npz'):
+        from tree_kernel import load_compiled
+        return load_compiled(path)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def missing_features(columns) -> List[str]:
+    present = set(columns)
+    return [col for col in EXPECTED_FEATURES if col not in present]
+
+
+def check_finite(X: np.ndarray, first_row: int = 1) -> np.ndarray:
+    # The NumPy models would score a missing value as if it were a real one,
+    # where the sklearn pipeline refused it, so such rows are rejected up front.
+    # first_row numbers the rows in the message (a chunk's position in its file)
+    bad = ~np.isfinite(X).all(axis=1)
+    if bad.any():
+        rows = np.flatnonzero(bad)
+        listed = ', '.join(str(row + first_row) for row in rows[:5]) + (', ...' if len(rows) > 5 else '')
+        raise ValueError(f"Features contain missing or infinite values in {len(rows):,} row(s): {listed}")
+    return X
+
+
+def feature_matrix(df: 'pd.DataFrame', first_row: int = 1) -> np.ndarray:
+    # Select the required features in training order as a plain float array
+    try:
+        X = df[EXPECTED_FEATURES].to_numpy(dtype=np.float64)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Features must be numeric: {e}") from None
+    return check_finite(X, first_row)
+
+
+def predict(pipeline, df: 'pd.DataFrame') -> np.ndarray:
+    # The scaler inside the pipeline was fitted at training time, so each
+    # call only runs transform + predict
+    return pipeline.predict(feature_matrix(df))
+
+
+def positive_proba(proba: np.ndarray) -> np.ndarray:
+    # Probability of the positive class, which is the last one in classes_ (1 for a 0/1 label)
+    return proba[:, -1]
+
+
+def classify(proba: np.ndarray, classes: np.ndarray, threshold: Optional[float] = None) -> np.ndarray:
+    # Labels from predict_proba output, without another model pass. By default the most
+    # probable class (what predict returns); with a threshold, a binary model predicts
+    # the positive class when its probability is above it
+    classes = np.asarray(classes)
+    if threshold is None:
+        return classes[proba.argmax(axis=1)]
+    return np.where(positive_proba(proba) > threshold, classes[-1], classes[0])
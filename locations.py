@@ -0,0 +1,298 @@
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Mean Earth radius used for haversine distances
+EARTH_RADIUS_KM = 6371.0088
+
+# Registry file loaded when no centers are supplied: an uncompressed Arrow IPC
+# file that is memory-mapped, so every process shares the same pages
+REGISTRY_PATH = 'data/treatment_centers.arrow'
+
+CENTERS_KEY = 'Parkinsons Treatment Centers'
+
+
+def _registry_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('name', pa.string()), ('address', pa.string()), ('area', pa.string()),
+        ('city', pa.string()), ('state', pa.string()), ('lat', pa.float64()), ('lon', pa.float64()),
+        ('specialties', pa.list_(pa.string())), ('phone', pa.string()), ('description', pa.string()),
+    ])
+
+
+def write_registry(centers: List[Dict], path: str = REGISTRY_PATH):
+    import pyarrow as pa
+
+    table = pa.Table.from_pylist(list(centers), schema=_registry_schema())
+    # Written next to the target and renamed over it, so processes that still
+    # map the old file keep reading a consistent copy until they reload
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_registry(path: str = REGISTRY_PATH):
+    import pyarrow as pa
+
+    # Zero-copy: the table's buffers point into the read-only mapping
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+class CenterTable:
+    # Read-only sequence of center dicts backed by an Arrow table; a row is
+    # decoded the first time it is accessed
+
+    def __init__(self, table):
+        self.table = table
+        self._decoded: Dict[int, Dict] = {}
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def __getitem__(self, row: int) -> Dict:
+        return self.take([row])[0]
+
+    def __iter__(self):
+        return iter(self.take(range(len(self))))
+
+    def take(self, rows) -> List[Dict]:
+        rows = [int(row) for row in rows]
+        missing = sorted({row for row in rows if row not in self._decoded})
+        if missing:
+            for row, center in zip(missing, self.table.take(missing).to_pylist()):
+                self._decoded[row] = center
+        return [self._decoded[row] for row in rows]
+
+    def column(self, name: str) -> list:
+        return self.table.column(name).to_pylist()
+
+    def coordinates(self) -> Tuple[np.ndarray, np.ndarray]:
+        return (self.table.column('lat').to_numpy(), self.table.column('lon').to_numpy())
+
+
+def _unit_vectors(lat, lon) -> np.ndarray:
+    # Points on the unit sphere; chord length there is monotonic in great-circle distance
+    lat, lon = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def _chord_to_km(chord: np.ndarray) -> np.ndarray:
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+
+def _km_to_chord(distance_km: float) -> float:
+    return 2.0 * np.sin(min(distance_km / EARTH_RADIUS_KM, np.pi) / 2.0)
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class _Registry:
+    # One loaded version of the centers and everything derived from it. A reload
+    # builds a new _Registry and publishes it with a single assignment, so a
+    # session that is reading the old one never sees a mix of the two versions
+
+    def __init__(self, centers, mtime: Optional[int] = None):
+        self.centers = centers
+        self.mtime = mtime
+        self._build_indexes()
+        self.areas = list(self.by_area)
+        self._spatial_index = None
+
+    def column(self, name: str) -> list:
+        if isinstance(self.centers, CenterTable):
+            return self.centers.column(name)
+        return [center[name] for center in self.centers]
+
+    def take(self, rows) -> List[Dict]:
+        if isinstance(self.centers, CenterTable):
+            return self.centers.take(rows)
+        return [self.centers[row] for row in rows]
+
+    def _build_indexes(self):
+        # Hash indexes built in one pass over the key columns: name -> row, and field value -> rows
+        self.by_name: Dict[str, int] = {}
+        self.by_area: Dict[str, List[int]] = {}
+        self.by_city: Dict[str, List[int]] = {}
+        self.by_state: Dict[str, List[int]] = {}
+        self.by_specialty: Dict[str, List[int]] = {}
+        columns = zip(self.column('name'), self.column('area'), self.column('city'),
+                      self.column('state'), self.column('specialties'))
+        for row, (name, area, city, state, specialties) in enumerate(columns):
+            self.by_name.setdefault(name, row)
+            self.by_area.setdefault(area, []).append(row)
+            self.by_city.setdefault(city, []).append(row)
+            self.by_state.setdefault(state, []).append(row)
+            for specialty in specialties:
+                self.by_specialty.setdefault(specialty, []).append(row)
+
+    def spatial_index(self):
+        # k-d tree over 3-D unit vectors, built on the first spatial query (scipy is imported lazily).
+        # Two sessions may both build it; either tree is correct for this version of the table
+        if self._spatial_index is None:
+            from scipy.spatial import cKDTree
+
+            if isinstance(self.centers, CenterTable):
+                lat, lon = self.centers.coordinates()
+            else:
+                count = len(self.centers)
+                lat = np.fromiter((center['lat'] for center in self.centers), dtype=np.float64, count=count)
+                lon = np.fromiter((center['lon'] for center in self.centers), dtype=np.float64, count=count)
+            self._spatial_index = cKDTree(_unit_vectors(lat, lon))
+        return self._spatial_index
+
+
+# Location Manager Class
+class LocationManager:
+    def __init__(self, centers_data: Optional[Dict] = None, path: Optional[str] = None):
+        # In-memory centers_data, or the registry file at path (REGISTRY_PATH by default)
+        self.centers_data = centers_data
+        self.path = REGISTRY_PATH if centers_data is None and path is None else path
+        self._reload_lock = threading.Lock()
+        self._registry = self._load()
+
+    def _load(self) -> _Registry:
+        if self.path is not None:
+            mtime = os.stat(self.path).st_mtime_ns
+            return _Registry(CenterTable(read_registry(self.path)), mtime)
+        return _Registry(self.centers_data[CENTERS_KEY])
+
+    def refresh(self) -> bool:
+        # Reload the registry if its file changed since it was loaded (one stat call otherwise).
+        # Sessions share this manager without a lock: every method reads self._registry once
+        if self.path is None:
+            return False
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._registry.mtime:
+            return False
+        with self._reload_lock:
+            if mtime != self._registry.mtime:
+                self._registry = self._load()
+        return True
+
+    @property
+    def version(self) -> int:
+        # Modification time of the loaded registry file (0 for in-memory centers)
+        return self._registry.mtime or 0
+
+    @property
+    def areas(self) -> List[str]:
+        return self._registry.areas
+
+    def _extract_areas(self) -> List[str]:
+        return list(self._registry.by_area)
+
+    def get_center_by_name(self, name: str) -> Optional[Dict]:
+        registry = self._registry
+        row = registry.by_name.get(name)
+        return None if row is None else registry.centers[row]
+
+    def get_centers_in_area(self, area: str) -> List[Dict]:
+        registry = self._registry
+        return registry.take(registry.by_area.get(area, []))
+
+    def find_centers(self, area: Optional[str] = None, city: Optional[str] = None,
+                     state: Optional[str] = None, specialty: Optional[str] = None) -> List[Dict]:
+        # Start from the smallest matching posting list and check the other filters per candidate,
+        # so the cost is O(k) in the size of that list
+        registry = self._registry
+        filters = [
+            (registry.by_area, area, lambda c: c['area'] == area),
+            (registry.by_city, city, lambda c: c['city'] == city),
+            (registry.by_state, state, lambda c: c['state'] == state),
+            (registry.by_specialty, specialty, lambda c: specialty in c['specialties']),
+        ]
+        active = [(index.get(value, []), check) for index, value, check in filters if value is not None]
+        if not active:
+            return list(registry.centers)
+
+        active.sort(key=lambda item: len(item[0]))
+        rows, _ = active[0]
+        checks = [check for _, check in active[1:]]
+        return [center for center in registry.take(rows) if all(check(center) for check in checks)]
+
+    def get_all_centers(self) -> List[Dict]:
+        return self._registry.centers
+
+    @staticmethod
+    def _query_nearest(registry: _Registry, lat, lon, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        points = np.atleast_2d(_unit_vectors(lat, lon))
+        k = min(k, len(registry.centers))
+        chord, rows = registry.spatial_index().query(points, k=k)
+        return _chord_to_km(chord).reshape(len(points), k), np.asarray(rows).reshape(len(points), k)
+
+    @staticmethod
+    def _query_radius(registry: _Registry, lat, lon, radius_km: float) -> List[Tuple[np.ndarray, np.ndarray]]:
+        points = np.atleast_2d(_unit_vectors(lat, lon))
+        index = registry.spatial_index()
+        results = []
+        for point, rows in zip(points, index.query_ball_point(points, _km_to_chord(radius_km))):
+            rows = np.asarray(rows, dtype=np.int64)
+            distances = _chord_to_km(np.linalg.norm(index.data[rows] - point, axis=1))
+            order = np.argsort(distances, kind='stable')
+            results.append((distances[order], rows[order]))
+        return results
+
+    def query_nearest(self, lat, lon, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        # Vectorized over query points: returns (distance_km, row) arrays of shape (n_queries, k)
+        return self._query_nearest(self._registry, lat, lon, k)
+
+    def query_radius(self, lat, lon, radius_km: float) -> List[Tuple[np.ndarray, np.ndarray]]:
+        # For every query point, (distance_km, row) arrays of the centers within radius_km, nearest first
+        return self._query_radius(self._registry, lat, lon, radius_km)
+
+    def nearest_centers(self, lat: float, lon: float, k: int = 5) -> List[Tuple[Dict, float]]:
+        registry = self._registry
+        distances, rows = self._query_nearest(registry, lat, lon, k)
+        return [(center, float(d)) for center, d in zip(registry.take(rows[0]), distances[0])]
+
+    def centers_within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Dict, float]]:
+        registry = self._registry
+        distances, rows = self._query_radius(registry, lat, lon, radius_km)[0]
+        return [(center, float(d)) for center, d in zip(registry.take(rows), distances)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(
+        description="Convert the center registry between JSON (for editing) and the Arrow file the app maps.")
+    parser.add_argument('source', help="A .json list of centers, or an .arrow registry to export")
+    parser.add_argument('output', nargs='?', default=REGISTRY_PATH, help="Destination .arrow or .json file")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.source.endswith('.arrow'):
+            centers = read_registry(args.source).to_pylist()
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(centers, f, indent=2, ensure_ascii=False)
+        else:
+            with open(args.source, encoding='utf-8') as f:
+                centers = json.load(f)
+            if isinstance(centers, dict):
+                centers = centers[CENTERS_KEY]
+            write_registry(centers, args.output)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Wrote {len(centers)} centers to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
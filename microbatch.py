@@ -0,0 +1,118 @@
+"""Request coalescing for single-row predictions.
+
+Concurrent callers each submit one feature row; a background thread gathers
+rows for up to ``max_wait_ms`` or ``max_batch_size`` rows, runs one
+vectorized model call and hands every caller its own row of the output.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+# Number of recent requests/batches kept for the latency percentiles
+METRICS_WINDOW = 10_000
+
+
+class MicroBatcher:
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._started_at = time.perf_counter()
+        self._latencies = deque(maxlen=METRICS_WINDOW)
+        self._batch_sizes = deque(maxlen=METRICS_WINDOW)
+
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='microbatcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, row: np.ndarray) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self._queue.put((np.asarray(row, dtype=np.float64).reshape(-1), future, time.perf_counter()))
+        return future
+
+    def predict(self, row: np.ndarray, timeout: Optional[float] = None):
+        return self.submit(row).result(timeout)
+
+    def _collect(self):
+        # Block for the first row, then keep gathering until the batch is full or the window closes
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            rows, futures, submitted = zip(*batch)
+            try:
+                outputs = self.predict_fn(np.vstack(rows))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                with self._lock:
+                    self._errors += len(batch)
+                continue
+
+            done = time.perf_counter()
+            for future, output in zip(futures, outputs):
+                future.set_result(output)
+            with self._lock:
+                self._requests += len(batch)
+                self._batches += 1
+                self._batch_sizes.append(len(batch))
+                self._latencies.extend(done - t for t in submitted)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            latencies = np.fromiter(self._latencies, dtype=np.float64)
+            batch_sizes = np.fromiter(self._batch_sizes, dtype=np.float64)
+            requests, batches, errors = self._requests, self._batches, self._errors
+        elapsed = time.perf_counter() - self._started_at
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000 if len(latencies) else (0.0, 0.0, 0.0)
+        return {
+            'requests': requests,
+            'batches': batches,
+            'errors': errors,
+            'mean_batch_size': float(batch_sizes.mean()) if len(batch_sizes) else 0.0,
+            'throughput_rps': requests / elapsed if elapsed > 0 else 0.0,
+            'latency_p50_ms': float(p50),
+            'latency_p95_ms': float(p95),
+            'latency_p99_ms': float(p99),
+        }
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
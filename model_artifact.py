@@ -0,0 +1,226 @@
+"""Compact, versioned, memory-mappable model artifact (``.pdm``).
+
+Layout: an 8-byte magic, a little-endian uint32 format version and uint32
+header length, a JSON header (feature list, classes, model type and
+parameters, array table), then every array as raw little-endian bytes at a
+64-byte aligned offset. Loading maps the file read-only and wraps each array
+as a zero-copy view, so the OS page cache is shared by every process serving
+the same file and only NumPy is imported.
+
+    python model_artifact.py parkinson_pipeline.pkl parkinson_model.pdm
+"""
+import json
+import struct
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from inference import check_finite
+
+MAGIC = b'PDMODEL\x00'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sII')
+
+MODEL_KNN = 'knn'
+MODEL_FOREST = 'forest'
+
+# Query rows compared against the training matrix at a time in NeighborsModel
+KNN_BLOCK_SIZE = 1024
+
+
+class NeighborsModel:
+    # NumPy re-implementation of a fitted KNeighborsClassifier (minkowski metric)
+
+    def __init__(self, fit_X: np.ndarray, fit_y: np.ndarray, classes: np.ndarray, n_neighbors: int,
+                 p: float, weights: str, scale: Optional[np.ndarray] = None,
+                 offset: Optional[np.ndarray] = None):
+        self.fit_X = fit_X
+        self.fit_y = fit_y
+        self.classes_ = classes
+        self.n_neighbors = int(n_neighbors)
+        self.p = float(p)
+        self.weights = weights
+        self.scale = scale
+        self.offset = offset
+
+    def _distances(self, X: np.ndarray) -> np.ndarray:
+        diff = np.abs(X[:, np.newaxis, :] - self.fit_X[np.newaxis, :, :])
+        if self.p == 2:
+            return np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+        if self.p == 1:
+            return diff.sum(axis=2)
+        return (diff ** self.p).sum(axis=2) ** (1.0 / self.p)
+
+    def _proba_block(self, X: np.ndarray) -> np.ndarray:
+        distances = self._distances(X)
+        k = self.n_neighbors
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        labels = self.fit_y[nearest]
+        if self.weights == 'distance':
+            nearest_dist = np.take_along_axis(distances, nearest, axis=1)
+            with np.errstate(divide='ignore'):
+                weights = 1.0 / nearest_dist
+            # Exact matches take all the weight, as in sklearn
+            exact = np.isinf(weights)
+            rows = exact.any(axis=1)
+            weights[rows] = exact[rows]
+        else:
+            weights = np.ones_like(labels, dtype=np.float64)
+
+        proba = np.zeros((len(X), len(self.classes_)), dtype=np.float64)
+        for c in range(len(self.classes_)):
+            proba[:, c] = (weights * (labels == c)).sum(axis=1)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        X = check_finite(np.asarray(X, dtype=np.float64))
+        if self.scale is not None:
+            X = X * self.scale
+            X += self.offset
+        blocks = [self._proba_block(X[i:i + KNN_BLOCK_SIZE]) for i in range(0, len(X), KNN_BLOCK_SIZE)]
+        return np.concatenate(blocks) if blocks else np.empty((0, len(self.classes_)))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def _split_pipeline(estimator) -> Tuple[object, Optional[np.ndarray], Optional[np.ndarray]]:
+    if not hasattr(estimator, 'steps'):
+        return estimator, None, None
+    *transforms, (_, model) = estimator.steps
+    if len(transforms) != 1 or not hasattr(transforms[0][1], 'data_range_'):
+        raise ValueError("Only a MinMaxScaler followed by the classifier can be converted")
+    scaler = transforms[0][1]
+    return model, scaler.scale_.astype(np.float64), scaler.min_.astype(np.float64)
+
+
+def convert(estimator, path: str, features: List[str], source: Optional[Dict[str, str]] = None):
+    # source: tree_kernel.source_info() of the estimator's pickle, used by tree models for large batches
+    model, scale, offset = _split_pipeline(estimator)
+    arrays: Dict[str, np.ndarray] = {}
+    if scale is not None:
+        arrays['scale'], arrays['offset'] = scale, offset
+
+    if type(model).__name__ == 'KNeighborsClassifier':
+        metric = model.effective_metric_
+        p = {'euclidean': 2, 'manhattan': 1}.get(metric, model.effective_metric_params_.get('p'))
+        if metric not in ('euclidean', 'manhattan', 'minkowski') or callable(model.weights):
+            raise ValueError(f"Unsupported KNeighborsClassifier metric/weights: {metric}/{model.weights}")
+        model_type = MODEL_KNN
+        params = {'n_neighbors': model.n_neighbors, 'p': p, 'weights': model.weights}
+        arrays['fit_X'] = np.ascontiguousarray(model._fit_X, dtype=np.float64)
+        arrays['fit_y'] = np.asarray(model._y, dtype=np.int64)
+        classes = model.classes_
+    else:
+        from tree_kernel import compile_forest
+
+        forest = compile_forest(model)
+        model_type = MODEL_FOREST
+        params = {'kind': forest.kind, 'max_depth': forest.max_depth, 'base_margin': forest.base_margin}
+        arrays.update(feature=forest.feature, threshold=forest.threshold, children=forest.children,
+                      value=forest.value, roots=forest.roots)
+        if forest.default_left is not None:
+            arrays['default_left'] = forest.default_left
+        classes = forest.classes_
+
+    header = {
+        'format_version': FORMAT_VERSION,
+        'model_type': model_type,
+        'features': list(features),
+        'classes': np.asarray(classes).tolist(),
+        'params': params,
+        'arrays': {},
+    }
+    if model_type == MODEL_FOREST and source:
+        header['source'] = source
+    # Array offsets are relative to the (aligned) start of the data section
+    position = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        header['arrays'][name] = {'dtype': array.dtype.newbyteorder('<').str, 'shape': list(array.shape),
+                                  'offset': position}
+        position += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = -(-(_PREAMBLE.size + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\x00' * (data_start - f.tell()))
+        for name, array in arrays.items():
+            f.seek(data_start + header['arrays'][name]['offset'])
+            f.write(array.astype(array.dtype.newbyteorder('<'), copy=False).tobytes())
+        f.truncate(data_start + position)
+
+
+def read_header(path: str) -> Tuple[dict, int]:
+    with open(path, 'rb') as f:
+        magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a model artifact")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported model artifact version {version} in {path}")
+        header = json.loads(f.read(header_len))
+    data_start = -(-(_PREAMBLE.size + header_len) // ALIGNMENT) * ALIGNMENT
+    return header, data_start
+
+
+def load_artifact(path: str):
+    header, data_start = read_header(path)
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        arrays[name] = np.frombuffer(mapped, dtype=dtype, count=count,
+                                     offset=data_start + spec['offset']).reshape(spec['shape'])
+
+    classes = np.asarray(header['classes'])
+    params = header['params']
+    if header['model_type'] == MODEL_KNN:
+        model = NeighborsModel(arrays['fit_X'], arrays['fit_y'], classes, params['n_neighbors'],
+                               params['p'], params['weights'], arrays.get('scale'), arrays.get('offset'))
+    elif header['model_type'] == MODEL_FOREST:
+        from tree_kernel import CompiledForest, resolve_source
+
+        model = CompiledForest(params['kind'], arrays['feature'], arrays['threshold'], arrays['children'],
+                               arrays['value'], arrays['roots'], params['max_depth'], classes,
+                               default_left=arrays.get('default_left'), base_margin=params['base_margin'],
+                               scale=arrays.get('scale'), offset=arrays.get('offset'),
+                               source=resolve_source(header.get('source'), path))
+    else:
+        raise ValueError(f"Unknown model type {header['model_type']!r} in {path}")
+
+    model.features = header['features']
+    return model
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    from inference import EXPECTED_FEATURES, PIPELINE_PATH, load_pipeline
+
+    parser = argparse.ArgumentParser(description="Convert a pickled model to the .pdm artifact format.")
+    parser.add_argument('model', nargs='?', default=PIPELINE_PATH, help="Pickled pipeline or classifier")
+    parser.add_argument('output', nargs='?', default='parkinson_model.pdm', help="Destination .pdm file")
+    args = parser.parse_args(argv)
+
+    try:
+        from tree_kernel import source_info
+
+        convert(load_pipeline(args.model), args.output, EXPECTED_FEATURES, source_info(args.model, args.output))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    header, _ = read_header(args.output)
+    print(f"Wrote {header['model_type']} artifact with {len(header['arrays'])} arrays to {args.output}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
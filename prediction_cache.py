@@ -0,0 +1,214 @@
+"""Prediction cache keyed by the content of each feature row.
+
+Every row is reduced to a 64-bit hash of its feature values
+(``pd.util.hash_pandas_object``), and its class probabilities are stored per
+model version, so replacing the model file never serves stale results and
+labels can be derived for any decision threshold. Lookups
+go to an in-memory LRU first and then to an optional SQLite file shared by
+processes and restarts. Only rows found in neither reach the model, and each
+distinct row in a batch is scored once.
+
+A second, differently keyed 64-bit hash of the row is stored with its
+probabilities and compared on every lookup. Two rows whose keys collide are
+then told apart and scored by the model; a wrong result would need both
+hashes to collide at once. The memory tier is capped in bytes
+(PD_PREDICTION_CACHE_MB, 64 MB by default, about 300k rows of a binary model).
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_MAX_MB = 64
+
+# SQLite file for the optional on-disk tier used by the app, and the memory cap
+CACHE_PATH_ENV = 'PD_PREDICTION_CACHE'
+MAX_MB_ENV = 'PD_PREDICTION_CACHE_MB'
+
+# Approximate memory of one entry besides its packed value: the int key and the
+# OrderedDict slot and node (measured with tracemalloc on CPython 3.11)
+ENTRY_OVERHEAD = 192
+
+# hash_pandas_object key (16 characters) of the check hash; the row key uses pandas' default
+CHECK_HASH_KEY = 'pd-row-check-v01'
+
+# Hash keys per SQLite statement (stays below the bound-parameter limit)
+_DISK_BATCH = 500
+
+
+def model_version(path: str) -> str:
+    # Content digest of the model file, so a retrained model gets fresh cache keys
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def configured_cache_path() -> Optional[str]:
+    return os.environ.get(CACHE_PATH_ENV) or None
+
+
+def configured_max_bytes() -> int:
+    return int(float(os.environ.get(MAX_MB_ENV, DEFAULT_MAX_MB)) * 2**20)
+
+
+def row_hashes(features: np.ndarray, hash_key: Optional[str] = None) -> np.ndarray:
+    import pandas as pd
+
+    options = {} if hash_key is None else {'hash_key': hash_key}
+    return pd.util.hash_pandas_object(pd.DataFrame(features, copy=False), index=False, **options).to_numpy()
+
+
+def _pack(checks: np.ndarray, proba: np.ndarray) -> List[bytes]:
+    # One bytes value per row: the check hash, then the class probabilities, little-endian
+    packed = np.empty((len(checks), 1 + proba.shape[1]), dtype='<u8')
+    packed[:, 0] = checks
+    packed[:, 1:] = proba.astype('<f8').view('<u8')
+    width = packed.shape[1] * 8
+    data = packed.tobytes()
+    return [data[i:i + width] for i in range(0, len(data), width)]
+
+
+def _check(value: bytes) -> int:
+    return int.from_bytes(value[:8], 'little')
+
+
+class PredictionCache:
+    def __init__(self, model_version: str, max_bytes: int = DEFAULT_MAX_MB * 2**20,
+                 disk_path: Optional[str] = None):
+        self.model_version = model_version
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        # Row hash -> packed check hash and class probabilities
+        self._entries: 'OrderedDict[int, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        # Row counts: served from memory, served from disk, sent to the model
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._scored = 0
+        # Distinct rows whose key matched a different row
+        self._collisions = 0
+        self._db = None
+        if disk_path is not None:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS row_probabilities "
+                             "(version TEXT, row_hash INTEGER, value BLOB, PRIMARY KEY (version, row_hash))")
+            self._db.commit()
+
+    def _disk_get(self, keys: np.ndarray) -> Dict[int, bytes]:
+        # SQLite integers are signed, so the uint64 hashes are stored as int64
+        found = {}
+        signed = keys.view(np.int64).tolist()
+        for i in range(0, len(signed), _DISK_BATCH):
+            chunk = signed[i:i + _DISK_BATCH]
+            rows = self._db.execute(
+                f"SELECT row_hash, value FROM row_probabilities WHERE version = ? AND row_hash IN "
+                f"({', '.join('?' * len(chunk))})", [self.model_version, *chunk])
+            found.update((key & 0xFFFFFFFFFFFFFFFF, bytes(value)) for key, value in rows)
+        return found
+
+    def _disk_put(self, keys: np.ndarray, values: List[bytes]):
+        self._db.executemany(
+            "INSERT OR REPLACE INTO row_probabilities VALUES (?, ?, ?)",
+            zip([self.model_version] * len(keys), keys.view(np.int64).tolist(), values))
+        self._db.commit()
+
+    def predict_proba(self, predict_proba_fn: Callable[[np.ndarray], np.ndarray],
+                      features: np.ndarray) -> np.ndarray:
+        features = np.asarray(features, dtype=np.float64)
+        if not len(features):
+            return np.asarray(predict_proba_fn(features), dtype=np.float64)
+        checks = row_hashes(features, CHECK_HASH_KEY)
+        keys, first, inverse = np.unique(row_hashes(features), return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        key_checks = checks[first]
+        # A row sharing its key with a different row of the same batch is scored on its own
+        clashes = np.flatnonzero(checks != key_checks[inverse])
+        counts = np.bincount(np.delete(inverse, clashes), minlength=len(keys))
+        values: List[Optional[bytes]] = [None] * len(keys)
+
+        with self._lock:
+            self._collisions += len(np.unique(checks[clashes]))
+            for i, (key, check) in enumerate(zip(keys.tolist(), key_checks.tolist())):
+                value = self._entries.get(key)
+                if value is None:
+                    continue
+                if _check(value) != check:
+                    self._collisions += 1
+                    continue
+                self._entries.move_to_end(key)
+                values[i] = value
+                self._hits += int(counts[i])
+
+            missing = [i for i, value in enumerate(values) if value is None]
+            if self._db is not None and missing:
+                found = self._disk_get(keys[missing])
+                for i in missing:
+                    value = found.get(int(keys[i]))
+                    if value is not None and _check(value) == int(key_checks[i]):
+                        values[i] = value
+                        self._disk_hits += int(counts[i])
+                        self._store(int(keys[i]), value)
+
+        # The model runs outside the lock, once per distinct unseen row
+        todo = np.array([i for i, value in enumerate(values) if value is None], dtype=np.int64)
+        if len(todo):
+            predicted = _pack(key_checks[todo],
+                              np.asarray(predict_proba_fn(features[first[todo]]), dtype=np.float64))
+            with self._lock:
+                self._misses += int(counts[todo].sum())
+                self._scored += len(todo)
+                for i, key, value in zip(todo.tolist(), keys[todo].tolist(), predicted):
+                    values[i] = value
+                    self._store(key, value)
+                if self._db is not None:
+                    self._disk_put(keys[todo], predicted)
+        proba = np.frombuffer(b''.join(values), dtype='<u8').reshape(len(keys), -1)[:, 1:]
+        proba = proba.view('<f8').astype(np.float64)[inverse]
+        if len(clashes):
+            proba[clashes] = predict_proba_fn(features[clashes])
+            with self._lock:
+                self._misses += len(clashes)
+                self._scored += len(clashes)
+        return proba
+
+    def _store(self, key: int, value: bytes):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= ENTRY_OVERHEAD + len(previous)
+        self._entries[key] = value
+        self._bytes += ENTRY_OVERHEAD + len(value)
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= ENTRY_OVERHEAD + len(evicted)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                'hits': self._hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'scored_rows': self._scored,
+                'hit_rate': (self._hits + self._disk_hits) / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'collisions': self._collisions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,226 @@
+"""Background prediction jobs for large uploads.
+
+A job scores one feature matrix in chunks on a small local thread pool, so
+the Streamlit script thread only submits it and then polls its progress.
+Each job lives in its own directory: ``status.json`` holds the state and
+the number of rows done, and the class probabilities are written chunk by
+chunk into ``proba.partial.npy`` and renamed to ``proba.npy`` when the job
+finishes. The job id is derived from the caller's key (upload digest plus
+model version), so a rerun, another session or a restarted server picks up
+the same job or its finished results instead of scoring the file again.
+
+Several processes on one host may share the jobs directory: a status file
+records the pid that owns the job and when that process started, and a job
+whose owner is still alive is left alone by the others, which only poll it.
+A reused pid (a restarted container's PID 1, say) started at another time,
+so a job left behind by an earlier process is rerun. The directory must not
+be shared between hosts, where that pid means nothing.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+DEFAULT_CHUNK_ROWS = 200_000
+DEFAULT_WORKERS = 1
+# Finished jobs kept on disk; older ones are removed when new jobs are submitted
+DEFAULT_MAX_JOBS = 20
+# Jobs polled or read within this many seconds are never pruned
+KEEP_RECENT_SECONDS = 600
+
+# Job directory and worker count used by the app
+JOBS_DIR_ENV = 'PD_JOBS_DIR'
+WORKERS_ENV = 'PD_JOB_WORKERS'
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+def configured_jobs_dir() -> str:
+    return os.environ.get(JOBS_DIR_ENV) or os.path.join(tempfile.gettempdir(), 'pd_prediction_jobs')
+
+
+def configured_workers() -> int:
+    return int(os.environ.get(WORKERS_ENV, DEFAULT_WORKERS))
+
+
+def job_id(key: str) -> str:
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _process_start(pid: int) -> Optional[str]:
+    # Boot id and start time (clock ticks since boot) of a process; None where /proc is missing
+    try:
+        with open('/proc/sys/kernel/random/boot_id') as f:
+            boot_id = f.read().strip()
+        with open(f'/proc/{pid}/stat') as f:
+            # The command name may contain spaces, so fields are counted after its closing parenthesis
+            starttime = f.read().rsplit(')', 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+    return f"{boot_id}:{starttime}"
+
+
+def _pid_alive(pid: Optional[int], started: Optional[str] = None) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    # A live process with the same pid but another start time is not the owner
+    return started is None or _process_start(pid) in (started, None)
+
+
+class JobQueue:
+    def __init__(self, predict_proba_fn: Callable[[np.ndarray], np.ndarray], jobs_dir: str,
+                 n_workers: int = DEFAULT_WORKERS, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 max_jobs: int = DEFAULT_MAX_JOBS):
+        self.predict_proba_fn = predict_proba_fn
+        self.jobs_dir = jobs_dir
+        self.chunk_rows = chunk_rows
+        self.max_jobs = max_jobs
+        os.makedirs(jobs_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix='prediction-job')
+        self._lock = threading.Lock()
+        # Jobs started by this process: id -> in-memory status and completion event
+        self._jobs: Dict[str, Dict] = {}
+        self._events: Dict[str, threading.Event] = {}
+
+    def _path(self, job: str, name: str = '') -> str:
+        return os.path.join(self.jobs_dir, job, name)
+
+    def _write_status(self, job: str, status: Dict):
+        # Replaced atomically, so pollers never read a half-written file
+        tmp_path = self._path(job, 'status.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(status, f)
+        os.replace(tmp_path, self._path(job, 'status.json'))
+
+    def _read_status(self, job: str) -> Optional[Dict]:
+        try:
+            with open(self._path(job, 'status.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _in_progress(self, job: str, status: Optional[Dict]) -> bool:
+        # Queued or running here, or in another process that is still alive. A job recorded
+        # under this process's pid that it is not running was left by an earlier process
+        if status is None or status['state'] not in (QUEUED, RUNNING):
+            return False
+        if job in self._jobs:
+            return True
+        pid = status.get('pid')
+        return pid != os.getpid() and _pid_alive(pid, status.get('pid_started'))
+
+    def _touch(self, job: str):
+        # The directory's mtime is the job's last use, which _prune goes by
+        try:
+            os.utime(self._path(job))
+        except OSError:
+            pass
+
+    def submit(self, key: str, features: np.ndarray) -> str:
+        job = job_id(key)
+        with self._lock:
+            current = self._jobs.get(job) or self._read_status(job)
+            if current is not None and current['state'] == DONE and os.path.exists(self._path(job, 'proba.npy')):
+                self._touch(job)
+                return job
+            # Another process may be scoring the same upload; this one only polls it
+            if self._in_progress(job, current):
+                return job
+            self._prune()
+            shutil.rmtree(self._path(job), ignore_errors=True)
+            os.makedirs(self._path(job))
+            status = {'state': QUEUED, 'rows': len(features), 'done_rows': 0, 'error': None,
+                      'submitted_at': time.time(), 'finished_at': None, 'pid': os.getpid(),
+                      'pid_started': _process_start(os.getpid())}
+            self._jobs[job] = status
+            self._events[job] = threading.Event()
+            self._write_status(job, status)
+        self._executor.submit(self._run, job, features)
+        return job
+
+    def _update(self, job: str, **changes):
+        with self._lock:
+            status = self._jobs[job]
+            status.update(changes)
+            self._write_status(job, status)
+
+    def _run(self, job: str, features: np.ndarray):
+        partial_path = self._path(job, 'proba.partial.npy')
+        try:
+            self._update(job, state=RUNNING)
+            proba = None
+            for start in range(0, max(len(features), 1), self.chunk_rows):
+                chunk = np.asarray(self.predict_proba_fn(features[start:start + self.chunk_rows]), dtype=np.float64)
+                # The output file is created once the first chunk gives the number of classes
+                if proba is None:
+                    proba = np.lib.format.open_memmap(partial_path, mode='w+', dtype=np.float64,
+                                                      shape=(len(features), chunk.shape[1]))
+                proba[start:start + len(chunk)] = chunk
+                self._update(job, done_rows=start + len(chunk))
+            proba.flush()
+            del proba
+            os.replace(partial_path, self._path(job, 'proba.npy'))
+            self._update(job, state=DONE, finished_at=time.time())
+        except Exception as e:
+            self._update(job, state=FAILED, error=str(e), finished_at=time.time())
+        finally:
+            self._events[job].set()
+
+    def status(self, job: str) -> Optional[Dict]:
+        self._touch(job)
+        with self._lock:
+            if job in self._jobs:
+                return dict(self._jobs[job])
+        status = self._read_status(job)
+        # Left queued or running by a process that is gone
+        if status is not None and status['state'] in (QUEUED, RUNNING) and not self._in_progress(job, status):
+            status.update(state=FAILED, error="interrupted before it finished")
+        return status
+
+    def wait(self, job: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        event = self._events.get(job)
+        if event is not None:
+            event.wait(timeout)
+        return self.status(job)
+
+    def result(self, job: str) -> np.ndarray:
+        # Memory-mapped read-only, so sessions paging the same results share the pages
+        self._touch(job)
+        return np.load(self._path(job, 'proba.npy'), mmap_mode='r')
+
+    def _prune(self):
+        # Least recently used jobs beyond max_jobs, skipping jobs that are in progress in any
+        # process or were used in the last KEEP_RECENT_SECONDS; called with the lock held
+        finished = []
+        now = time.time()
+        jobs = os.listdir(self.jobs_dir)
+        for job in jobs:
+            try:
+                last_used = os.path.getmtime(self._path(job))
+            except OSError:
+                continue
+            if now - last_used < KEEP_RECENT_SECONDS:
+                continue
+            if self._in_progress(job, self._jobs.get(job) or self._read_status(job)):
+                continue
+            finished.append((last_used, job))
+        for _, job in sorted(finished)[:max(0, len(jobs) - self.max_jobs + 1)]:
+            shutil.rmtree(self._path(job), ignore_errors=True)
+            self._jobs.pop(job, None)
+            self._events.pop(job, None)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
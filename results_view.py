@@ -0,0 +1,93 @@
+"""Paged view, summary and CSV export of prediction results.
+
+Only the rows of the current page are turned into a DataFrame and sent to
+the browser. The metric cards and the distribution chart share one
+``np.bincount`` over the predicted classes, and the full results are written
+as CSV in fixed-size chunks when the download is requested instead of being
+embedded in the page.
+"""
+import io
+from typing import TYPE_CHECKING, Dict, Iterator
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+POSITIVE_LABEL = "Has Parkinson's Disease"
+NEGATIVE_LABEL = "Does not have Parkinson's Disease"
+
+PAGE_SIZES = (25, 100, 500, 1000)
+DEFAULT_PAGE_SIZE = 100
+
+# Rows formatted per CSV chunk of the download
+EXPORT_CHUNK_ROWS = 100_000
+
+
+def summarize(predictions: np.ndarray) -> Dict[str, int]:
+    # One pass over the 0/1 predictions gives every count the summary shows
+    counts = np.bincount(np.asarray(predictions, dtype=np.intp), minlength=2)
+    return {
+        'total': int(counts.sum()),
+        'positive': int(counts[1]),
+        'negative': int(counts[0]),
+    }
+
+
+def page_count(n_rows: int, page_size: int) -> int:
+    return max(1, -(-n_rows // page_size))
+
+
+def _export_schema():
+    import pyarrow as pa
+
+    return pa.schema([('Row', pa.int64()), ('Prediction', pa.string()), ('Probability', pa.float64())])
+
+
+def _frame(predictions: np.ndarray, probabilities: np.ndarray, start: int,
+           decimals: int = 3) -> 'pd.DataFrame':
+    import pandas as pd
+
+    return pd.DataFrame({
+        'Row': np.arange(start + 1, start + len(predictions) + 1),
+        'Prediction': np.where(predictions == 1, POSITIVE_LABEL, NEGATIVE_LABEL),
+        'Probability': np.round(probabilities, decimals),
+    })
+
+
+def page_frame(predictions: np.ndarray, probabilities: np.ndarray, page: int,
+               page_size: int = DEFAULT_PAGE_SIZE) -> 'pd.DataFrame':
+    # page is 1-based, as shown in the app
+    start = (page - 1) * page_size
+    stop = start + page_size
+    return _frame(predictions[start:stop], probabilities[start:stop], start)
+
+
+def iter_csv(predictions: np.ndarray, probabilities: np.ndarray,
+             chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    # Header first, then one encoded block per chunk of rows; Arrow's CSV writer
+    # formats numbers far faster than DataFrame.to_csv
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    labels = pa.array([NEGATIVE_LABEL, POSITIVE_LABEL])
+    sink = io.BytesIO()
+    with pa_csv.CSVWriter(sink, _export_schema(), write_options=pa_csv.WriteOptions(quoting_style='needed')) as writer:
+        for start in range(0, len(predictions), chunk_rows):
+            stop = min(start + chunk_rows, len(predictions))
+            writer.write_table(pa.table({
+                'Row': np.arange(start + 1, stop + 1),
+                'Prediction': labels.take(np.asarray(predictions[start:stop], dtype=np.intp)),
+                'Probability': np.round(probabilities[start:stop], 6),
+            }))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    # The header alone when there are no rows
+    if sink.tell():
+        yield sink.getvalue()
+
+
+def to_csv(predictions: np.ndarray, probabilities: np.ndarray,
+           chunk_rows: int = EXPORT_CHUNK_ROWS) -> bytes:
+    return b''.join(iter_csv(predictions, probabilities, chunk_rows))
@@ -0,0 +1,102 @@
+"""Multi-process scoring for large prediction batches.
+
+Inputs are split into contiguous shards that are scored in a process pool.
+Every worker unpickles the pipeline once when it starts, and shards are
+reassembled in input order.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from inference import ARTIFACT_PATH, feature_matrix, load_pipeline
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_SHARD_SIZE = 50_000
+
+# Set in each worker process by _init_worker
+_worker_pipeline = None
+
+
+def _init_worker(model_path: str):
+    global _worker_pipeline
+    # One BLAS/OpenMP thread per worker, otherwise N processes oversubscribe the cores
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+    _worker_pipeline = load_pipeline(model_path)
+
+
+def _score_shard(shard: np.ndarray, method: str = 'predict') -> np.ndarray:
+    return getattr(_worker_pipeline, method)(shard)
+
+
+class ParallelScorer:
+    def __init__(self, model_path: str = ARTIFACT_PATH, n_workers: Optional[int] = None,
+                 shard_size: int = DEFAULT_SHARD_SIZE, pipeline=None):
+        self.model_path = model_path
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self._pipeline = pipeline
+        self._executor = None
+        # Scoring may run on several threads (the app's job queue); only one of them
+        # starts the pool or loads the pipeline
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Started on first use; "spawn" avoids forking the threads of a running Streamlit server
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.n_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.model_path,),
+                )
+            return self._executor
+
+    def _get_pipeline(self):
+        with self._lock:
+            if self._pipeline is None:
+                self._pipeline = load_pipeline(self.model_path)
+            return self._pipeline
+
+    def _run(self, method: str, features: np.ndarray) -> np.ndarray:
+        # Batches that fit in one shard are not worth the inter-process round trip
+        if self.n_workers == 1 or len(features) <= self.shard_size:
+            return getattr(self._get_pipeline(), method)(features)
+
+        shards = [features[i:i + self.shard_size] for i in range(0, len(features), self.shard_size)]
+        # Executor.map yields results in submission order
+        return np.concatenate(list(self._get_executor().map(_score_shard, shards, [method] * len(shards))))
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        return self._run('predict', features)
+
+    def score_proba(self, features: np.ndarray) -> np.ndarray:
+        return self._run('predict_proba', features)
+
+    def predict(self, df: 'pd.DataFrame') -> np.ndarray:
+        return self.score(feature_matrix(df))
+
+    def predict_proba(self, df: 'pd.DataFrame') -> np.ndarray:
+        return self.score_proba(feature_matrix(df))
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
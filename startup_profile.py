@@ -0,0 +1,58 @@
+"""Startup profiling for the Streamlit app.
+
+Heavy modules are imported through ``import_module`` from the code path that
+needs them, and each tab body runs inside ``section``. Both record how long
+they took the first time they ran in this process, i.e. the cold-start cost.
+Set PD_PROFILE_STARTUP=1 to show the report in the app and log it to stderr.
+"""
+import importlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+ENABLED = os.environ.get('PD_PROFILE_STARTUP', '') not in ('', '0')
+
+# (kind, name, milliseconds) in the order they were first measured
+_timings: List[Tuple[str, str, float]] = []
+_seen = set()
+_reported = False
+
+
+def _record(kind: str, name: str, elapsed: float):
+    if (kind, name) not in _seen:
+        _seen.add((kind, name))
+        _timings.append((kind, name, elapsed * 1000))
+
+
+def import_module(name: str):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _record('import', name, time.perf_counter() - start)
+    return module
+
+
+@contextmanager
+def section(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record('render', name, time.perf_counter() - start)
+
+
+def timings() -> List[Tuple[str, str, float]]:
+    return list(_timings)
+
+
+def log_report():
+    # Printed once per process, after the first full run of the script
+    global _reported
+    if ENABLED and not _reported:
+        _reported = True
+        for kind, name, ms in _timings:
+            print(f"[startup] {kind:<6} {name:<28} {ms:9.1f} ms", file=sys.stderr)
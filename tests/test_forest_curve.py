@@ -0,0 +1,57 @@
+"""forest_curve against forests fitted from scratch at every point.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import MinMaxScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forest_curve import forest_curve  # noqa: E402
+from train import RANDOM_STATE, make_sampler  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_classification(n_samples=300, n_features=22, n_informative=8, weights=[0.3], random_state=0)
+    return X[:240], y[:240], X[240:], y[240:]
+
+
+@pytest.mark.parametrize('max_samples', [None, 0.6])
+def test_curve_matches_forests_fitted_from_scratch(data, max_samples):
+    X_train, y_train, X_test, y_test = data
+    curve = forest_curve(X_train, y_train, X_test, y_test, max_trees=24, step=6, max_samples=max_samples)
+    assert curve['n_trees'].tolist() == [6, 12, 18, 24]
+
+    X_fit, y_fit = make_sampler(RANDOM_STATE).fit_resample(X_train, y_train)
+    scaler = MinMaxScaler().fit(X_fit)
+    covered = 0
+    for i, n_trees in enumerate(curve['n_trees']):
+        with warnings.catch_warnings():
+            # Too few trees for every row to be out of bag at least once
+            warnings.simplefilter('ignore', UserWarning)
+            forest = RandomForestClassifier(n_estimators=int(n_trees), oob_score=True, max_samples=max_samples,
+                                            random_state=RANDOM_STATE).fit(scaler.transform(X_fit), y_fit)
+        assert curve['train_accuracy'][i] == forest.score(scaler.transform(X_train), y_train)
+        assert curve['test_accuracy'][i] == forest.score(scaler.transform(X_test), y_test)
+        # sklearn scores rows without an out-of-bag vote as the first class; compare where all have one
+        oob = forest.oob_decision_function_
+        if not np.isnan(oob).any() and (oob.sum(axis=1) > 0).all():
+            covered += 1
+            assert curve['oob_accuracy'][i] == pytest.approx(forest.oob_score_, abs=1e-12)
+    assert covered
+
+
+@pytest.mark.parametrize('max_trees, step', [(10, 0), (10, -2), (3, 5)])
+def test_rejects_curves_without_points(data, max_trees, step):
+    with pytest.raises(ValueError, match='step'):
+        forest_curve(*data, max_trees=max_trees, step=step)
@@ -0,0 +1,127 @@
+"""The compiled tree kernel against sklearn and xgboost predict_proba.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tree_kernel  # noqa: E402
+from inference import EXPECTED_FEATURES  # noqa: E402
+from model_artifact import convert, load_artifact  # noqa: E402
+from tree_kernel import LIBRARY_MIN_ROWS, compile_forest, load_compiled, source_info  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_classification(n_samples=1_500, n_features=len(EXPECTED_FEATURES), n_informative=10,
+                               weights=[0.25], random_state=0)
+    # Feature scales like the voice measurements, so the scaler matters
+    X = X * np.logspace(-3, 2, X.shape[1]) + np.linspace(0, 100, X.shape[1])
+    return X[:1_000], y[:1_000], X[1_000:]
+
+
+def forest(data):
+    X, y, _ = data
+    return Pipeline([
+        ('scaler', MinMaxScaler()),
+        ('model', RandomForestClassifier(n_estimators=50, random_state=0)),
+    ]).fit(X, y)
+
+
+def boosted(data):
+    xgboost = pytest.importorskip('xgboost')
+    X, y, _ = data
+    return Pipeline([
+        ('scaler', MinMaxScaler()),
+        ('model', xgboost.XGBClassifier(n_estimators=50, max_depth=6, learning_rate=0.1)),
+    ]).fit(X, y)
+
+
+def kernel_only(compiled):
+    # Traversal for every batch size, without handing large batches to the estimator
+    compiled.library = compiled.source = None
+    return compiled
+
+
+def test_forest_matches_sklearn(data):
+    estimator = forest(data)
+    X_eval = data[2]
+    compiled = kernel_only(compile_forest(estimator))
+    np.testing.assert_array_equal(compiled.predict_proba(X_eval), estimator.predict_proba(X_eval))
+    np.testing.assert_array_equal(compiled.predict(X_eval), estimator.predict(X_eval))
+
+
+def test_xgboost_matches_xgboost(data):
+    estimator = boosted(data)
+    X_eval = data[2]
+    compiled = kernel_only(compile_forest(estimator))
+    # Both sum float32 leaf weights; only the order of the additions can differ
+    np.testing.assert_allclose(compiled.predict_proba(X_eval), estimator.predict_proba(X_eval), rtol=0, atol=1e-6)
+    np.testing.assert_array_equal(compiled.predict(X_eval), estimator.predict(X_eval))
+
+
+def test_xgboost_missing_values_follow_default_direction(data):
+    estimator = boosted(data)
+    X_eval = data[2][:40].copy()
+    X_eval[::3, 5] = np.nan
+    compiled = kernel_only(compile_forest(estimator))
+    np.testing.assert_allclose(compiled.predict_proba(X_eval), estimator.predict_proba(X_eval), rtol=0, atol=1e-6)
+
+
+def test_forest_rejects_missing_values(data):
+    X_eval = data[2][:10].copy()
+    X_eval[3, 0] = np.nan
+    with pytest.raises(ValueError, match='row'):
+        compile_forest(forest(data)).predict_proba(X_eval)
+
+
+@pytest.mark.parametrize('make', [forest, boosted])
+def test_large_batches_use_the_estimator(data, make):
+    estimator = make(data)
+    X_eval = data[2]
+    compiled = compile_forest(estimator)
+    assert len(X_eval) >= LIBRARY_MIN_ROWS[compiled.kind]
+    assert compiled._library_model() is estimator
+    np.testing.assert_array_equal(compiled.predict_proba(X_eval), estimator.predict_proba(X_eval))
+
+
+def test_saved_kernel_loads_its_source_pickle(data, tmp_path):
+    estimator = forest(data)
+    X_eval = data[2]
+    pickle_path, npz_path, pdm_path = tmp_path / 'forest.pkl', tmp_path / 'forest.npz', tmp_path / 'forest.pdm'
+    pickle_path.write_bytes(pickle.dumps(estimator))
+    compile_forest(estimator).save(str(npz_path), source_info(str(pickle_path), str(npz_path)))
+    convert(estimator, str(pdm_path), EXPECTED_FEATURES, source_info(str(pickle_path), str(pdm_path)))
+
+    for compiled in (load_compiled(str(npz_path)), load_artifact(str(pdm_path))):
+        np.testing.assert_array_equal(compiled.predict_proba(X_eval[:10]), estimator.predict_proba(X_eval[:10]))
+        assert compiled.library is None
+        np.testing.assert_array_equal(compiled.predict_proba(X_eval), estimator.predict_proba(X_eval))
+        assert compiled.library is not None
+
+
+def test_changed_source_pickle_is_not_used(data, tmp_path, monkeypatch):
+    estimator = forest(data)
+    X_eval = data[2]
+    pickle_path, npz_path = tmp_path / 'forest.pkl', tmp_path / 'forest.npz'
+    pickle_path.write_bytes(pickle.dumps(estimator))
+    compile_forest(estimator).save(str(npz_path), source_info(str(pickle_path), str(npz_path)))
+    # Retrained and overwritten after the kernel was exported
+    pickle_path.write_bytes(pickle.dumps(RandomForestClassifier(n_estimators=3).fit(*data[:2])))
+
+    compiled = load_compiled(str(npz_path))
+    monkeypatch.setitem(tree_kernel.LIBRARY_MIN_ROWS, compiled.kind, 1)
+    np.testing.assert_array_equal(compiled.predict_proba(X_eval), estimator.predict_proba(X_eval))
+    assert compiled.library is None
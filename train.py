@@ -0,0 +1,368 @@
+"""Training pipeline for the Parkinson's classifier.
+
+Runs the notebook's model selection as a script. RandomOverSampler,
+MinMaxScaler and the classifier form one imblearn Pipeline, so oversampling
+only ever sees the training part of each split. The candidate models are
+cross-validated with every (model, fold) fit running in parallel, the RF,
+XGBoost and KNN grids are searched with all cores, and the best search
+result is written as the pickled pipeline and the .pdm artifact the app
+loads. Wall-clock time is reported per stage. The oversampled and scaled
+folds are prepared once (cv_cache.py) and shared by the model comparison and
+every grid point.
+
+``--search halving`` replaces the exhaustive grids with successive halving:
+every configuration is first cross-validated on a small share of the rows
+and only the best third moves on to three times as many, until the last
+round uses every training row. XGBoost also drops n_estimators from its grid
+and stops adding rounds once a validation split stops improving.
+
+    python train.py data/parkinsons.data --n-jobs -1
+    python train.py data/parkinsons.data --search halving
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+from inference import ARTIFACT_PATH, EXPECTED_FEATURES, PIPELINE_PATH, missing_features
+
+# UCI voice dataset with the 'name' and 'status' columns, as read by the notebook
+DATA_PATH = 'data/parkinsons.data'
+TARGET = 'status'
+
+# Minority/majority ratio after oversampling, as in the notebook
+SAMPLING_STRATEGY = 0.6
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+CV_FOLDS = 5
+
+SEARCH_GRID = 'grid'
+SEARCH_HALVING = 'halving'
+
+# Successive halving: each round keeps 1/factor of the configurations and gives
+# them factor times as many rows; the last round uses the whole training split
+HALVING_FACTOR = 3
+
+# XGBoost early stopping in halving mode: rounds without improvement on the
+# validation share of each fit before boosting stops
+EARLY_STOPPING_ROUNDS = 10
+VALIDATION_FRACTION = 0.2
+
+# Grids from the notebook, addressed to the 'model' step of the pipeline
+PARAM_GRIDS = {
+    'Random Forest': {
+        'model__n_estimators': [50, 100, 200],
+        'model__max_depth': [None, 10, 20],
+        'model__min_samples_split': [2, 5, 10],
+        'model__min_samples_leaf': [1, 2, 4],
+    },
+    'XGBoost': {
+        'model__n_estimators': [50, 100, 200],
+        'model__max_depth': [3, 6, 9],
+        'model__learning_rate': [0.01, 0.1, 0.3],
+        'model__gamma': [0, 0.1, 0.2],
+    },
+    'K Neighbors': {
+        'model__n_neighbors': [3, 5, 7, 9],
+        'model__weights': ['uniform', 'distance'],
+        'model__p': [1, 2],
+    },
+}
+
+
+class EarlyStoppingXGBClassifier(ClassifierMixin, BaseEstimator):
+    # XGBClassifier whose number of rounds is found by early stopping on a
+    # stratified validation split, then refitted on every row with that many
+    # rounds, so the fitted model (estimator_) has no unused trees and
+    # compiles like any other XGBClassifier
+
+    def __init__(self, n_estimators: int = 200, max_depth: int = 6, learning_rate: float = 0.3,
+                 gamma: float = 0.0, early_stopping_rounds: int = EARLY_STOPPING_ROUNDS,
+                 validation_fraction: float = VALIDATION_FRACTION, random_state: Optional[int] = None,
+                 n_jobs: int = 1):
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.learning_rate = learning_rate
+        self.gamma = gamma
+        self.early_stopping_rounds = early_stopping_rounds
+        self.validation_fraction = validation_fraction
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+
+    def fit(self, X: np.ndarray, y: np.ndarray):
+        from sklearn.model_selection import train_test_split
+        from xgboost import XGBClassifier
+
+        params = {'max_depth': self.max_depth, 'learning_rate': self.learning_rate, 'gamma': self.gamma,
+                  'random_state': self.random_state, 'n_jobs': self.n_jobs}
+        X_fit, X_val, y_fit, y_val = train_test_split(
+            X, y, test_size=self.validation_fraction, stratify=y, random_state=self.random_state)
+        probe = XGBClassifier(n_estimators=self.n_estimators, early_stopping_rounds=self.early_stopping_rounds,
+                              eval_metric='logloss', **params)
+        probe.fit(X_fit, y_fit, eval_set=[(X_val, y_val)], verbose=False)
+        self.best_n_estimators_ = probe.best_iteration + 1
+        self.estimator_ = XGBClassifier(n_estimators=self.best_n_estimators_, **params).fit(X, y)
+        self.classes_ = self.estimator_.classes_
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.estimator_.predict(X)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.estimator_.predict_proba(X)
+
+
+@contextmanager
+def stage(name: str, timings: List[Tuple[str, float]]):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings.append((name, elapsed))
+        print(f"[train] {name:<32} {elapsed:8.2f} s", file=sys.stderr)
+
+
+def load_dataset(path: str = DATA_PATH) -> Tuple[np.ndarray, np.ndarray]:
+    header = pd.read_csv(path, nrows=0).columns
+    missing_cols = missing_features(header) + ([TARGET] if TARGET not in header else [])
+    if missing_cols:
+        raise ValueError(f"Missing columns in {path}: {', '.join(missing_cols)}")
+    df = pd.read_csv(path, usecols=EXPECTED_FEATURES + [TARGET])
+    return df[EXPECTED_FEATURES].to_numpy(dtype=np.float64), df[TARGET].to_numpy(dtype=np.int64)
+
+
+def candidate_models(random_state: int = RANDOM_STATE) -> Dict:
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.svm import SVC
+    from sklearn.tree import DecisionTreeClassifier
+    from xgboost import XGBClassifier
+
+    # One thread per fit; the parallelism comes from running fits side by side
+    return {
+        'Logistic Regression': LogisticRegression(max_iter=1000),
+        'SVM': SVC(random_state=random_state),
+        'Decision Trees': DecisionTreeClassifier(random_state=random_state),
+        'Random Forest': RandomForestClassifier(random_state=random_state, n_jobs=1),
+        'K Neighbors': KNeighborsClassifier(),
+        'XGBoost': XGBClassifier(random_state=random_state, n_jobs=1),
+    }
+
+
+def oversampling_targets(y: np.ndarray) -> Dict[int, int]:
+    # Minority classes raised to SAMPLING_STRATEGY x the majority count, never
+    # lowered: a float ratio makes RandomOverSampler raise on splits (such as
+    # the small subsets of successive halving) that are already more balanced
+    classes, counts = np.unique(y, return_counts=True)
+    majority = counts.max()
+    return {int(label): max(int(count), int(SAMPLING_STRATEGY * majority))
+            for label, count in zip(classes, counts) if count < majority}
+
+
+def make_sampler(random_state: int = RANDOM_STATE):
+    from imblearn.over_sampling import RandomOverSampler
+
+    return RandomOverSampler(sampling_strategy=oversampling_targets, random_state=random_state)
+
+
+def make_pipeline(model, random_state: int = RANDOM_STATE):
+    from imblearn.pipeline import Pipeline
+    from sklearn.preprocessing import MinMaxScaler
+
+    # The sampler only runs in fit, so predictions never see resampled rows
+    return Pipeline([
+        ('sampler', make_sampler(random_state)),
+        ('scaler', MinMaxScaler()),
+        ('model', model),
+    ])
+
+
+def _cv(random_state: int):
+    from sklearn.model_selection import StratifiedKFold
+
+    return StratifiedKFold(CV_FOLDS, shuffle=True, random_state=random_state)
+
+
+def cv_folds(X: np.ndarray, y: np.ndarray, random_state: int = RANDOM_STATE,
+             cache_dir: Optional[str] = None):
+    from sklearn.preprocessing import MinMaxScaler
+
+    import cv_cache
+
+    # Oversampled and scaled once per fold, then shared by every model and grid point
+    cache = cv_cache.FoldCache(cache_dir or cv_cache.configured_cache_dir(), _cv(random_state),
+                               make_sampler(random_state), MinMaxScaler())
+    return cache.folds(X, y)
+
+
+def compare_models(X: np.ndarray, y: np.ndarray, n_jobs: int = -1, random_state: int = RANDOM_STATE,
+                   cache_dir: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    import cv_cache
+
+    # Every (model, fold) pair is one task, so all cores stay busy across models
+    return cv_cache.cross_validate(candidate_models(random_state), cv_folds(X, y, random_state, cache_dir), n_jobs)
+
+
+def grid_search(name: str, X: np.ndarray, y: np.ndarray, n_jobs: int = -1,
+                random_state: int = RANDOM_STATE, cache_dir: Optional[str] = None):
+    from sklearn.base import clone
+    from sklearn.pipeline import Pipeline
+
+    import cv_cache
+
+    # Scores match GridSearchCV on make_pipeline(model); only the model step is fitted per grid point
+    model = candidate_models(random_state)[name]
+    search = cv_cache.grid_search(Pipeline([('model', model)]), PARAM_GRIDS[name],
+                                  cv_folds(X, y, random_state, cache_dir), n_jobs)
+    search.best_estimator_ = make_pipeline(clone(model), random_state).set_params(**search.best_params_).fit(X, y)
+    return search
+
+
+def halving_search(name: str, X: np.ndarray, y: np.ndarray, n_jobs: int = -1,
+                   random_state: int = RANDOM_STATE, cache_dir: Optional[str] = None):
+    from sklearn.base import clone
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingGridSearchCV
+    from sklearn.pipeline import Pipeline
+
+    import cv_cache
+
+    model, grid = candidate_models(random_state)[name], dict(PARAM_GRIDS[name])
+    if name == 'XGBoost':
+        # Early stopping picks the number of rounds, up to the grid's largest value
+        model = EarlyStoppingXGBClassifier(n_estimators=max(grid.pop('model__n_estimators')),
+                                           random_state=random_state)
+    halving = HalvingGridSearchCV(
+        make_pipeline(model, random_state), grid, cv=_cv(random_state), scoring='accuracy',
+        factor=HALVING_FACTOR, min_resources='exhaust', random_state=random_state, n_jobs=n_jobs, refit=False,
+    ).fit(X, y)
+
+    # The last round rarely gets every row (on small data it may see only a third), so its
+    # candidates are cross-validated again on the full training split, on the same folds as
+    # grid_search; best_score_ is then comparable across models and search modes
+    last_round = np.flatnonzero(halving.cv_results_['iter'] == halving.n_iterations_ - 1)
+    finalists = [{key: [value] for key, value in halving.cv_results_['params'][i].items()} for i in last_round]
+    search = cv_cache.grid_search(Pipeline([('model', model)]), finalists,
+                                  cv_folds(X, y, random_state, cache_dir), n_jobs)
+    search.best_estimator_ = make_pipeline(clone(model), random_state).set_params(**search.best_params_).fit(X, y)
+    search.halving_ = halving
+    return search
+
+
+SEARCHES = {SEARCH_GRID: grid_search, SEARCH_HALVING: halving_search}
+
+
+def production_pipeline(pipeline):
+    from sklearn.pipeline import Pipeline
+
+    # Oversampling is a training-time step; the app needs only the scaler and the
+    # model (the plain XGBClassifier inside an EarlyStoppingXGBClassifier)
+    return Pipeline([(name, step.estimator_ if isinstance(step, EarlyStoppingXGBClassifier) else step)
+                     for name, step in pipeline.steps if name != 'sampler'])
+
+
+def write_artifacts(pipeline, pipeline_path: str = PIPELINE_PATH, artifact_path: str = ARTIFACT_PATH):
+    from model_artifact import convert
+    from tree_kernel import source_info
+
+    pipeline = production_pipeline(pipeline)
+    # Written next to the targets and renamed over them, so a running app never reads half a file
+    data = pickle.dumps(pipeline)
+    with open(f"{pipeline_path}.tmp", 'wb') as f:
+        f.write(data)
+    # A tree model in the artifact hands large batches back to the pickled pipeline
+    convert(pipeline, f"{artifact_path}.tmp", EXPECTED_FEATURES, source_info(pipeline_path, artifact_path, data))
+    os.replace(f"{pipeline_path}.tmp", pipeline_path)
+    os.replace(f"{artifact_path}.tmp", artifact_path)
+
+
+def train(data_path: str = DATA_PATH, n_jobs: int = -1, model_name: Optional[str] = None,
+          pipeline_path: str = PIPELINE_PATH, artifact_path: str = ARTIFACT_PATH,
+          random_state: int = RANDOM_STATE, search: str = SEARCH_GRID,
+          cv_cache_dir: Optional[str] = None) -> Dict:
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+    from sklearn.model_selection import train_test_split
+
+    timings: List[Tuple[str, float]] = []
+    with stage('load data', timings):
+        X, y = load_dataset(data_path)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=TEST_SIZE, stratify=y, random_state=random_state)
+
+    with stage(f'compare models ({CV_FOLDS}-fold CV)', timings):
+        comparison = compare_models(X_train, y_train, n_jobs, random_state, cv_cache_dir)
+    for name, scores in comparison.items():
+        print(f"  {name:<20} " + '  '.join(f"{metric} {value:.3f}" for metric, value in scores.items()),
+              file=sys.stderr)
+
+    searches = {}
+    for name in ([model_name] if model_name else PARAM_GRIDS):
+        with stage(f'{search} search: {name}', timings):
+            searches[name] = SEARCHES[search](name, X_train, y_train, n_jobs, random_state, cv_cache_dir)
+        print(f"  best CV accuracy {searches[name].best_score_:.3f} with {searches[name].best_params_}",
+              file=sys.stderr)
+
+    # The search refits the best configuration on the whole training split
+    best_name = max(searches, key=lambda name: searches[name].best_score_)
+    best = searches[best_name].best_estimator_
+    with stage('evaluate on test split', timings):
+        y_pred = best.predict(X_test)
+        test_scores = {
+            'accuracy': accuracy_score(y_test, y_pred),
+            'precision': precision_score(y_test, y_pred, zero_division=0),
+            'recall': recall_score(y_test, y_pred, zero_division=0),
+            'f1': f1_score(y_test, y_pred, zero_division=0),
+        }
+    print(f"  {best_name}: " + '  '.join(f"{metric} {value:.3f}" for metric, value in test_scores.items()),
+          file=sys.stderr)
+
+    with stage('write artifacts', timings):
+        write_artifacts(best, pipeline_path, artifact_path)
+    return {
+        'model': best_name,
+        'params': searches[best_name].best_params_,
+        'cv_accuracy': float(searches[best_name].best_score_),
+        'test': test_scores,
+        'comparison': comparison,
+        'timings': timings,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train the Parkinson's classifier and write the app's model files.")
+    parser.add_argument('data', nargs='?', default=DATA_PATH, help="CSV with the voice features and a 'status' column")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Parallel fits (-1 uses every core)")
+    parser.add_argument('--model', choices=sorted(PARAM_GRIDS), help="Search only this model (default: all, keep the best)")
+    parser.add_argument('--search', choices=sorted(SEARCHES), default=SEARCH_GRID,
+                        help="Exhaustive grid, or successive halving with XGBoost early stopping")
+    parser.add_argument('--cv-cache', help="Directory of the prepared CV folds (default: $PD_CV_CACHE or the temp dir)")
+    parser.add_argument('--pipeline', default=PIPELINE_PATH, help="Destination of the pickled sklearn pipeline")
+    parser.add_argument('--artifact', default=ARTIFACT_PATH, help="Destination of the .pdm artifact")
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE, help="Random state for splits, sampling and models")
+    args = parser.parse_args(argv)
+
+    try:
+        result = train(args.data, args.n_jobs, args.model, args.pipeline, args.artifact, args.seed, args.search,
+                       args.cv_cache)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    total = sum(elapsed for _, elapsed in result['timings'])
+    print(f"Trained {result['model']} (CV accuracy {result['cv_accuracy']:.3f}, "
+          f"test accuracy {result['test']['accuracy']:.3f}) in {total:.1f} s; "
+          f"wrote {args.pipeline} and {args.artifact}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
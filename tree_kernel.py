@@ -0,0 +1,334 @@
+"""Pure-NumPy inference for the notebook's tree ensembles.
+
+``compile_forest`` flattens a fitted RandomForest/ExtraTrees/DecisionTree
+classifier or a binary XGBClassifier (optionally behind the MinMaxScaler of
+a Pipeline) into packed per-node arrays: feature index, threshold, the two
+children and leaf value. Leaves point back at themselves with an infinite
+threshold, so ``CompiledForest`` can walk every tree for a whole batch at
+once, one tree level per step, without branching on leaf nodes. It can be
+saved to / loaded from an ``.npz`` file without sklearn or xgboost installed.
+
+The traversal beats the libraries on single rows and micro-batches but not
+in bulk (about 5x slower than sklearn at 10k rows). Large batches are
+therefore handed to the estimator the trees came from. After
+``compile_forest`` that is the fitted estimator itself. A loaded kernel uses
+the pickle it was exported from, if that file is still there, unchanged
+(same SHA-256), and loadable.
+
+    python tree_kernel.py parkinson_pipeline.pkl parkinson_forest.npz
+"""
+import hashlib
+import json
+import os
+import pickle
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from inference import check_finite
+
+FORMAT_VERSION = 1
+
+KIND_SKLEARN = 'sklearn'
+KIND_XGBOOST = 'xgboost'
+
+# Samples traversed together; keeps the per-level node arrays cache-sized
+BLOCK_SIZE = 2048
+
+# Batch size from which the source estimator is faster than the traversal
+# (crossover measured with benchmarks/bench_tree_kernel.py)
+LIBRARY_MIN_ROWS = {KIND_SKLEARN: 400, KIND_XGBOOST: 75}
+
+
+def source_info(pickle_path: str, output_path: str, data: Optional[bytes] = None) -> Dict[str, str]:
+    # Where a saved kernel finds its source pickle: relative to the kernel file, with its digest.
+    # data is the pickle's content when the file is not in place yet
+    if data is None:
+        with open(pickle_path, 'rb') as f:
+            data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    return {'path': os.path.relpath(os.path.abspath(pickle_path), os.path.dirname(os.path.abspath(output_path))),
+            'sha256': digest}
+
+
+def resolve_source(source: Optional[Dict[str, str]], path: str) -> Optional[Tuple[str, str]]:
+    if not source:
+        return None
+    return os.path.join(os.path.dirname(os.path.abspath(path)), source['path']), source['sha256']
+
+
+class CompiledForest:
+    def __init__(self, kind: str, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, max_depth: int,
+                 classes: np.ndarray, default_left: Optional[np.ndarray] = None,
+                 base_margin: float = 0.0, scale: Optional[np.ndarray] = None,
+                 offset: Optional[np.ndarray] = None, library=None,
+                 source: Optional[Tuple[str, str]] = None):
+        self.kind = kind
+        self.feature = feature
+        self.threshold = threshold
+        # Flattened (n_nodes, 2) array: children[2 * node] is the left child, +1 the right one
+        self.children = children.reshape(-1)
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.default_left = default_left
+        self.base_margin = float(base_margin)
+        # Optional MinMaxScaler parameters: X * scale + offset
+        self.scale = scale
+        self.offset = offset
+        # Estimator used for large batches, or the (path, sha256) of its pickle, loaded on first use
+        self.library = library
+        self.source = source
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _checked(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        # xgboost routes missing values by default_left; sklearn trees refuse them
+        if self.kind != KIND_XGBOOST:
+            check_finite(X)
+        return X
+
+    def _prepare(self, X: np.ndarray) -> np.ndarray:
+        X = self._checked(X)
+        if self.scale is not None:
+            X = X * self.scale
+            X += self.offset
+        # Both sklearn and xgboost compare float32 features against the split thresholds
+        return X.astype(np.float32)
+
+    def _apply_block(self, X: np.ndarray) -> np.ndarray:
+        n_samples, n_features = X.shape
+        flat_X = X.reshape(-1)
+        row_offsets = np.arange(n_samples, dtype=np.int32) * n_features
+        nodes = np.repeat(self.roots[:, np.newaxis], n_samples, axis=1)
+        for _ in range(self.max_depth):
+            x = flat_X[row_offsets + self.feature[nodes]]
+            threshold = self.threshold[nodes]
+            if self.kind == KIND_XGBOOST:
+                go_right = ~np.where(np.isnan(x), self.default_left[nodes], x < threshold)
+            else:
+                go_right = ~(x <= threshold)
+            nodes = self.children[2 * nodes + go_right]
+        return nodes
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        # Leaf node index reached in every tree, shape (n_trees, n_samples)
+        X = self._prepare(X)
+        if len(X) <= BLOCK_SIZE:
+            return self._apply_block(X)
+        return np.concatenate([self._apply_block(X[i:i + BLOCK_SIZE])
+                               for i in range(0, len(X), BLOCK_SIZE)], axis=1)
+
+    def _library_model(self):
+        # Stays None if the pickle is gone, has changed since export, or cannot be unpickled
+        # (e.g. sklearn/xgboost not installed); large batches then use the traversal too
+        if self.library is None and self.source is not None:
+            path, digest = self.source
+            self.source = None
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                if hashlib.sha256(data).hexdigest() == digest:
+                    self.library = pickle.loads(data)
+            except (OSError, ImportError, AttributeError, pickle.UnpicklingError):
+                pass
+        return self.library
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if len(X) >= LIBRARY_MIN_ROWS[self.kind] and self._library_model() is not None:
+            return np.asarray(self.library.predict_proba(self._checked(X)))
+        leaves = self.apply(X)
+        if self.kind == KIND_XGBOOST:
+            # Float32 margin accumulated tree by tree, then the logistic link
+            margin = np.full(leaves.shape[1], self.base_margin, dtype=np.float32)
+            for tree_leaves in leaves:
+                margin += self.value[tree_leaves, 0]
+            positive = np.float32(1.0) / (np.float32(1.0) + np.exp(-margin))
+            return np.column_stack([np.float32(1.0) - positive, positive])
+
+        # Same per-tree accumulation order as sklearn's forest predict_proba
+        proba = np.zeros((leaves.shape[1], self.value.shape[1]), dtype=np.float64)
+        for tree_leaves in leaves:
+            proba += self.value[tree_leaves]
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def save(self, path: str, source: Optional[Dict[str, str]] = None):
+        # source: source_info() of the pickle the kernel was exported from
+        arrays = {
+            'feature': self.feature, 'threshold': self.threshold, 'children': self.children,
+            'value': self.value, 'roots': self.roots, 'classes': self.classes_,
+        }
+        if self.default_left is not None:
+            arrays['default_left'] = self.default_left
+        if self.scale is not None:
+            arrays['scale'] = self.scale
+            arrays['offset'] = self.offset
+        meta = {'format_version': FORMAT_VERSION, 'kind': self.kind,
+                'max_depth': self.max_depth, 'base_margin': self.base_margin, 'source': source}
+        np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+
+
+def load_compiled(path: str) -> CompiledForest:
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        if meta['format_version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled forest version {meta['format_version']} in {path}")
+        arrays = {name: data[name] for name in data.files if name != 'meta'}
+    return CompiledForest(
+        meta['kind'], arrays['feature'], arrays['threshold'], arrays['children'],
+        arrays['value'], arrays['roots'], meta['max_depth'], arrays['classes'],
+        default_left=arrays.get('default_left'), base_margin=meta['base_margin'],
+        scale=arrays.get('scale'), offset=arrays.get('offset'),
+        source=resolve_source(meta.get('source'), path),
+    )
+
+
+def _pack(trees: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    # Concatenate per-tree node arrays, shifting child indices by each tree's offset.
+    # Leaves become self-loops that always go "left", so traversal needs no leaf test.
+    sizes = np.array([len(tree['feature']) for tree in trees])
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+    packed = {'roots': roots}
+    for name in trees[0]:
+        packed[name] = np.concatenate([tree[name] for tree in trees])
+
+    left = np.concatenate([tree['left'] + root for tree, root in zip(trees, roots)])
+    right = np.concatenate([tree['right'] + root for tree, root in zip(trees, roots)])
+    leaf = np.concatenate([tree['left'] < 0 for tree in trees])
+    node_ids = np.arange(len(leaf))
+    packed['children'] = np.column_stack([np.where(leaf, node_ids, left),
+                                          np.where(leaf, node_ids, right)]).astype(np.int32)
+    packed['feature'] = np.where(leaf, 0, packed['feature']).astype(np.int32)
+    packed['threshold'] = np.where(leaf, np.inf, packed['threshold']).astype(packed['threshold'].dtype)
+    if 'default_left' in packed:
+        packed['default_left'] = packed['default_left'] | leaf
+    del packed['left'], packed['right']
+    packed['max_depth'] = _depth(trees)
+    return packed
+
+
+def _depth(trees: List[Dict[str, np.ndarray]]) -> int:
+    deepest = 0
+    for tree in trees:
+        depth, frontier = 0, np.array([0])
+        while True:
+            children = np.concatenate([tree['left'][frontier], tree['right'][frontier]])
+            frontier = children[children >= 0]
+            if not len(frontier):
+                break
+            depth += 1
+        deepest = max(deepest, depth)
+    return deepest
+
+
+def _sklearn_trees(estimators) -> List[Dict[str, np.ndarray]]:
+    trees = []
+    for estimator in estimators:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :].astype(np.float64)
+        # DecisionTreeClassifier.predict_proba normalises the leaf values
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        trees.append({
+            'feature': tree.feature,
+            'threshold': tree.threshold.astype(np.float64),
+            'left': tree.children_left,
+            'right': tree.children_right,
+            'value': value / normalizer,
+        })
+    return trees
+
+
+def _xgboost_trees(classifier):
+    booster = classifier.get_booster()
+    model = json.loads(booster.save_raw('json'))['learner']
+    objective = model['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Only binary:logistic XGBoost models can be compiled, got {objective}")
+
+    trees = []
+    for tree in model['gradient_booster']['model']['trees']:
+        left = np.asarray(tree['left_children'], dtype=np.int64)
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+        leaf = left < 0
+        trees.append({
+            'feature': np.asarray(tree['split_indices'], dtype=np.int64),
+            # Leaf weights are stored in split_conditions for leaf nodes
+            'threshold': conditions,
+            'left': left,
+            'right': np.asarray(tree['right_children'], dtype=np.int64),
+            'value': np.where(leaf, conditions, 0.0).astype(np.float32)[:, np.newaxis],
+            'default_left': np.asarray(tree['default_left'], dtype=bool),
+        })
+
+    base_score = model['learner_model_param']['base_score'].strip('[]')
+    base_score = float(base_score.split(',')[0])
+    base_margin = np.float32(np.log(base_score / (1.0 - base_score)))
+    return trees, base_margin
+
+
+def compile_forest(estimator) -> CompiledForest:
+    library = estimator
+    scale = offset = None
+    if hasattr(estimator, 'steps'):
+        *transforms, (_, estimator) = estimator.steps
+        if len(transforms) > 1 or not hasattr(transforms[0][1], 'data_range_'):
+            raise ValueError("Only a MinMaxScaler followed by the classifier can be compiled")
+        scaler = transforms[0][1]
+        scale, offset = scaler.scale_.astype(np.float64), scaler.min_.astype(np.float64)
+
+    classes = np.asarray(estimator.classes_)
+    kind = type(estimator).__name__
+    base_margin = 0.0
+    if kind in ('RandomForestClassifier', 'ExtraTreesClassifier'):
+        trees = _sklearn_trees(estimator.estimators_)
+    elif kind == 'DecisionTreeClassifier':
+        trees = _sklearn_trees([estimator])
+    elif kind == 'XGBClassifier':
+        trees, base_margin = _xgboost_trees(estimator)
+    else:
+        raise ValueError(f"{kind} is not a supported tree ensemble")
+
+    packed = _pack(trees)
+    return CompiledForest(
+        KIND_XGBOOST if kind == 'XGBClassifier' else KIND_SKLEARN,
+        packed['feature'], packed['threshold'], packed['children'], packed['value'],
+        packed['roots'], packed['max_depth'], classes,
+        default_left=packed.get('default_left'), base_margin=base_margin, scale=scale, offset=offset,
+        library=library,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    from inference import PIPELINE_PATH, load_pipeline
+
+    parser = argparse.ArgumentParser(description="Export a pickled tree ensemble to a NumPy inference kernel.")
+    parser.add_argument('model', nargs='?', default=PIPELINE_PATH, help="Pickled pipeline or classifier")
+    parser.add_argument('output', nargs='?', default='parkinson_forest.npz', help="Destination .npz file")
+    args = parser.parse_args(argv)
+
+    try:
+        compiled = compile_forest(load_pipeline(args.model))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    compiled.save(args.output, source_info(args.model, args.output))
+    print(f"Wrote {compiled.n_trees} trees ({len(compiled.feature):,} nodes, depth {compiled.max_depth}) "
+          f"to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
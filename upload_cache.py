@@ -0,0 +1,86 @@
+"""Bounded cache of parsed uploads shared by every session.
+
+Streamlit reruns the whole script on each widget interaction, including the
+"Make Predictions" click. The feature matrix of an upload is therefore
+stored under the digest of the file's bytes, and later reruns (and other
+sessions uploading the same file) reuse it instead of parsing it again. The
+cache is capped both in entries and in bytes and evicts the least recently
+used upload first. Cached arrays are read-only because they are shared.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 8
+DEFAULT_MAX_MB = 512
+
+# Limits used by the app
+MAX_ENTRIES_ENV = 'PD_UPLOAD_CACHE_ENTRIES'
+MAX_MB_ENV = 'PD_UPLOAD_CACHE_MB'
+
+
+def configured_limits() -> Tuple[int, int]:
+    # (max entries, max bytes)
+    max_entries = int(os.environ.get(MAX_ENTRIES_ENV, DEFAULT_MAX_ENTRIES))
+    max_mb = float(os.environ.get(MAX_MB_ENV, DEFAULT_MAX_MB))
+    return max_entries, int(max_mb * 2**20)
+
+
+class UploadCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_MB * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._peak_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            features = self._entries.get(key)
+            if features is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return features
+
+    def put(self, key: str, features: np.ndarray) -> np.ndarray:
+        features.setflags(write=False)
+        # An upload larger than the whole budget is returned but not kept
+        if features.nbytes > self.max_bytes or self.max_entries < 1:
+            return features
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = features
+            self._bytes += features.nbytes
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._evictions += 1
+            self._peak_bytes = max(self._peak_bytes, self._bytes)
+        return features
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'peak_bytes': self._peak_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
@@ -0,0 +1,349 @@
+"""The 22 voice features of the model, computed from WAV recordings of sustained phonation.
+
+Pitch is tracked with a normalized frame autocorrelation. Its peak also gives
+the harmonics-to-noise ratio. The glottal cycles are then marked by peak
+picking, and the period and amplitude sequences feed the MDVP jitter and
+shimmer measures, computed as sliding-window quotients over the whole
+sequence at once. The nonlinear measures run on the signal resampled to
+25 kHz:
+
+- RPDE: entropy of the recurrence times of the delay-embedded signal.
+- DFA: logistic-transformed scaling exponent of detrended fluctuation
+  analysis, with every window detrended in one matrix product.
+- D2: Grassberger-Procaccia correlation dimension, from quantiles of the
+  pairwise distances of a subsample.
+
+spread1, spread2 and PPE come from the semitone pitch sequence. The papers
+behind the dataset describe spread1 and spread2 only loosely, so here
+spread1 is the log of the relative F0 spread, spread2 is the spread of the
+whitened pitch residual, and PPE is the normalized entropy of that residual.
+The values land on the dataset's scale but are not those of the original
+MATLAB code. Ratios are written as fractions, as in parkinsons.data
+(MDVP:Jitter(%) of 0.006 means 0.6%).
+
+    python voice_features.py recordings/*.wav --output features.csv --workers 4
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from inference import EXPECTED_FEATURES
+
+# Pitch search range (the dataset's MDVP:Flo and MDVP:Fhi span 65-592 Hz)
+F0_MIN = 60.0
+F0_MAX = 600.0
+FRAME_SECONDS = 0.04
+HOP_SECONDS = 0.01
+# Normalized autocorrelation peak above which a frame counts as voiced
+VOICING_THRESHOLD = 0.45
+# Per octave of lag, so the true period beats its multiples (Boersma 1993; higher
+# than Praat's 0.01, which also runs a path search across frames)
+OCTAVE_COST = 0.05
+# Periods further than this from the frame's pitch are treated as tracking errors
+PERIOD_TOLERANCE = 0.2
+# Half-width of the parabola fitted to each pitch mark, as a fraction of the shortest period
+PEAK_FIT_FRACTION = 0.05
+
+# Sample rate, embedding and radius of the nonlinear measures (Little et al. 2007)
+ANALYSIS_RATE = 25_000
+RPDE_DIMENSION = 4
+RPDE_DELAY = 35
+RPDE_RADIUS = 0.12
+RPDE_MAX_PERIOD = 1000
+# Start points followed for recurrences, spread evenly over the recording
+RPDE_STARTS = 5000
+DFA_SCALES = np.arange(50, 201, 10)
+D2_DIMENSION = 10
+D2_POINTS = 1000
+D2_QUANTILES = (0.005, 0.1)
+# Reference pitch of the semitone scale and the bins of the PPE histogram
+SEMITONE_REFERENCE_HZ = 127.09
+PPE_BINS = np.linspace(-3.0, 3.0, 31)
+
+
+def read_wav(path: str) -> Tuple[np.ndarray, int]:
+    from scipy.io import wavfile
+
+    sample_rate, data = wavfile.read(path)
+    signal = data.astype(np.float64)
+    if signal.ndim > 1:
+        signal = signal.mean(axis=1)
+    if data.dtype == np.uint8:
+        signal -= 128.0
+    return signal, int(sample_rate)
+
+
+def _frame_autocorrelation(signal: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Per frame: F0, normalized autocorrelation peak and RMS (Boersma's method,
+    # with the window's own autocorrelation divided out)
+    frame = int(round(FRAME_SECONDS * sample_rate))
+    hop = int(round(HOP_SECONDS * sample_rate))
+    if len(signal) < frame:
+        raise ValueError(f"recording is shorter than {FRAME_SECONDS * 1000:.0f} ms")
+    frames = sliding_window_view(signal, frame)[::hop]
+    frames = frames - frames.mean(axis=1, keepdims=True)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+
+    window = np.hanning(frame)
+    n_fft = 1 << int(np.ceil(np.log2(2 * frame)))
+    spectra = np.fft.rfft(frames * window, n_fft)
+    acf = np.fft.irfft(spectra.real ** 2 + spectra.imag ** 2, n_fft)[:, :frame]
+    window_acf = np.fft.irfft(np.abs(np.fft.rfft(window, n_fft)) ** 2, n_fft)[:frame]
+
+    min_lag = int(np.floor(sample_rate / F0_MAX))
+    max_lag = min(int(np.ceil(sample_rate / F0_MIN)), frame // 2)
+    energy = acf[:, :1]
+    lags = acf[:, min_lag:max_lag + 1] / np.where(energy > 0, energy, 1.0)
+    lags /= window_acf[min_lag:max_lag + 1] / window_acf[0]
+    octaves = np.log2(np.arange(min_lag, max_lag + 1) / min_lag)
+    best = (lags - OCTAVE_COST * octaves).argmax(axis=1)
+    # Parabolic interpolation of the peak lag
+    inner = (best > 0) & (best < lags.shape[1] - 1)
+    rows = np.flatnonzero(inner)
+    left, peak, right = (lags[rows, best[rows] + offset] for offset in (-1, 0, 1))
+    shift = np.zeros(len(best))
+    curvature = left - 2 * peak + right
+    shift[rows] = np.where(curvature < 0, 0.5 * (left - right) / np.where(curvature < 0, curvature, -1.0), 0.0)
+    lag = min_lag + best + shift
+    strength = np.clip(lags[np.arange(len(best)), best], 0.0, 1.0)
+    return sample_rate / lag, strength, rms
+
+
+def _pitch_marks(signal: np.ndarray, sample_rate: int, f0: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    from scipy.signal import find_peaks
+
+    # Glottal pulses may point either way; mark the stronger polarity
+    if -signal.min() > signal.max():
+        signal = -signal
+    shortest = sample_rate / np.percentile(f0, 95)
+    marks, _ = find_peaks(signal, distance=max(1, int(0.7 * shortest)))
+    # Sub-sample position of each peak from a least-squares parabola
+    # over a few percent of the period, which averages out sample noise
+    half = max(1, int(round(PEAK_FIT_FRACTION * shortest)))
+    marks = marks[(marks >= half) & (marks < len(signal) - half)]
+    offsets = np.arange(-half, half + 1)
+    design = np.column_stack([offsets ** 2, offsets, np.ones(len(offsets))])
+    c2, c1, _ = np.linalg.pinv(design) @ sliding_window_view(signal, len(offsets))[marks - half].T
+    # A window that is not concave keeps the sample peak
+    concave = c2 < 0
+    shift = np.where(concave, np.clip(-c1 / (2 * np.where(concave, c2, -1.0)), -half, half), 0.0)
+    # The sampled peak is the cycle's amplitude; at audio rates it is within
+    # a fraction of a percent of the true one
+    return marks + shift, signal[marks]
+
+
+def _pair_mean(values: np.ndarray, valid: np.ndarray, order: int) -> float:
+    # Mean absolute difference of the given order over runs of valid values
+    diff = np.diff(values, n=order)
+    ok = sliding_window_view(valid, order + 1).all(axis=1)
+    return float(np.mean(np.abs(diff[ok]))) if ok.any() else np.nan
+
+
+def _perturbation_quotient(values: np.ndarray, valid: np.ndarray, points: int) -> float:
+    # Mean deviation of each value from its centered k-point average, relative to the mean
+    if len(values) < points:
+        return np.nan
+    windows = sliding_window_view(values, points)
+    ok = sliding_window_view(valid, points).all(axis=1)
+    if not ok.any():
+        return np.nan
+    deviation = np.abs(windows[ok, points // 2] - windows[ok].mean(axis=1))
+    return float(np.mean(deviation) / np.mean(values[valid]))
+
+
+def perturbation_features(periods: np.ndarray, amplitudes: np.ndarray, valid: np.ndarray) -> Dict[str, float]:
+    mean_period = np.mean(periods[valid])
+    mean_amplitude = np.mean(amplitudes[valid])
+    jitter_abs = _pair_mean(periods, valid, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_amplitudes = 20 * np.log10(amplitudes)
+    return {
+        'MDVP:Jitter(%)': jitter_abs / mean_period,
+        'MDVP:Jitter(Abs)': jitter_abs,
+        'MDVP:RAP': _perturbation_quotient(periods, valid, 3),
+        'MDVP:PPQ': _perturbation_quotient(periods, valid, 5),
+        'Jitter:DDP': _pair_mean(periods, valid, 2) / mean_period,
+        'MDVP:Shimmer': _pair_mean(amplitudes, valid, 1) / mean_amplitude,
+        'MDVP:Shimmer(dB)': _pair_mean(log_amplitudes, valid & (amplitudes > 0), 1),
+        'Shimmer:APQ3': _perturbation_quotient(amplitudes, valid, 3),
+        'Shimmer:APQ5': _perturbation_quotient(amplitudes, valid, 5),
+        'MDVP:APQ': _perturbation_quotient(amplitudes, valid, 11),
+        'Shimmer:DDA': _pair_mean(amplitudes, valid, 2) / mean_amplitude,
+    }
+
+
+def _embed(signal: np.ndarray, dimension: int, delay: int) -> np.ndarray:
+    span = (dimension - 1) * delay
+    return sliding_window_view(signal, span + 1)[:, ::delay]
+
+
+def rpde(signal: np.ndarray, dimension: int = RPDE_DIMENSION, delay: int = RPDE_DELAY,
+         radius: float = RPDE_RADIUS, max_period: int = RPDE_MAX_PERIOD, n_starts: int = RPDE_STARTS) -> float:
+    # Signal scaled to [-1, 1], as the radius assumes
+    peak = np.max(np.abs(signal))
+    points = _embed(signal / peak if peak > 0 else signal, dimension, delay)
+    n = max(0, len(points) - 1 - max_period)
+    # All start points are followed forward together, one lag at a time; only
+    # the points that have not returned to their radius yet are compared
+    pending = np.unique(np.linspace(0, n - 1, min(n, n_starts)).astype(np.intp))
+    left = np.zeros(len(pending), dtype=bool)
+    return_times = []
+    for lag in range(1, max_period + 1):
+        if not len(pending):
+            break
+        inside = np.sum((points[pending + lag] - points[pending]) ** 2, axis=1) < radius ** 2
+        returned = left & inside
+        if returned.any():
+            return_times.append(np.full(int(returned.sum()), lag))
+        left = (left | ~inside)[~returned]
+        pending = pending[~returned]
+    if not return_times:
+        return np.nan
+    density = np.bincount(np.concatenate(return_times), minlength=max_period + 1)[1:].astype(np.float64)
+    density /= density.sum()
+    nonzero = density[density > 0]
+    return float(-np.sum(nonzero * np.log(nonzero)) / np.log(max_period))
+
+
+def dfa(signal: np.ndarray, scales: Sequence[int] = DFA_SCALES) -> float:
+    profile = np.cumsum(signal - signal.mean())
+    fluctuations = []
+    for scale in scales:
+        windows = profile[:len(profile) // scale * scale].reshape(-1, scale)
+        # Least-squares line removed from every window with one projection
+        basis, _ = np.linalg.qr(np.vstack([np.ones(scale), np.arange(scale)]).T)
+        residual = windows - (windows @ basis) @ basis.T
+        fluctuations.append(np.sqrt(np.mean(residual ** 2)))
+    alpha = np.polyfit(np.log(scales), np.log(fluctuations), 1)[0]
+    return float(1.0 / (1.0 + np.exp(-alpha)))
+
+
+def correlation_dimension(signal: np.ndarray, dimension: int = D2_DIMENSION, delay: int = RPDE_DELAY,
+                          n_points: int = D2_POINTS, quantiles: Tuple[float, float] = D2_QUANTILES) -> float:
+    from scipy.spatial.distance import pdist
+
+    points = _embed(signal, dimension, delay)
+    # Evenly spaced subsample, which also keeps temporally adjacent points apart
+    points = points[np.linspace(0, len(points) - 1, min(n_points, len(points))).astype(np.intp)]
+    distances = pdist(points)
+    distances = distances[distances > 0]
+    # C(r) = q at r = the q-quantile, so the slope of log C against log r is fitted directly
+    q = np.geomspace(*quantiles, 12)
+    radii = np.quantile(distances, q)
+    return float(np.polyfit(np.log(radii), np.log(q), 1)[0])
+
+
+def pitch_entropy_features(f0: np.ndarray) -> Dict[str, float]:
+    semitones = 12 * np.log2(f0 / SEMITONE_REFERENCE_HZ)
+    # Second-order linear prediction whitens the slow pitch drift
+    design = np.column_stack([semitones[1:-1], semitones[:-2], np.ones(len(semitones) - 2)])
+    coefficients, *_ = np.linalg.lstsq(design, semitones[2:], rcond=None)
+    residual = semitones[2:] - design @ coefficients
+    counts, _ = np.histogram(np.clip(residual, PPE_BINS[0], PPE_BINS[-1]), PPE_BINS)
+    p = counts[counts > 0] / counts.sum()
+    return {
+        'spread1': float(np.log(np.std(np.log(f0)))),
+        'spread2': float(np.std(residual)),
+        'PPE': float(-np.sum(p * np.log(p)) / np.log(len(PPE_BINS) - 1)),
+    }
+
+
+def _resample(signal: np.ndarray, sample_rate: int, target_rate: int) -> np.ndarray:
+    from math import gcd
+
+    from scipy.signal import resample_poly
+
+    if sample_rate == target_rate:
+        return signal
+    common = gcd(sample_rate, target_rate)
+    return resample_poly(signal, target_rate // common, sample_rate // common)
+
+
+def extract_features(signal: np.ndarray, sample_rate: int) -> Dict[str, float]:
+    signal = np.asarray(signal, dtype=np.float64)
+    signal = signal - signal.mean()
+    f0_frames, strength, rms = _frame_autocorrelation(signal, sample_rate)
+    voiced = (strength > VOICING_THRESHOLD) & (rms > 0.05 * rms.max())
+    if voiced.sum() < 3:
+        raise ValueError("no sustained voicing found")
+
+    # HNR and NHR from the autocorrelation peak of each voiced frame
+    r = np.clip(strength[voiced], 1e-6, 1 - 1e-6)
+    hnr = float(np.mean(10 * np.log10(r / (1 - r))))
+    nhr = float(np.mean((1 - r) / r))
+
+    marks, peaks = _pitch_marks(signal, sample_rate, f0_frames[voiced])
+    if len(marks) < 13:
+        raise ValueError("too few glottal cycles found")
+    periods = np.diff(marks) / sample_rate
+    # Each period is checked against the pitch of the frame that contains it
+    hop = int(round(HOP_SECONDS * sample_rate))
+    frame = int(round(FRAME_SECONDS * sample_rate))
+    frame_index = np.clip(((marks[:-1] + marks[1:]) / 2 - frame / 2) // hop, 0, len(voiced) - 1).astype(np.intp)
+    expected = 1.0 / f0_frames[frame_index]
+    valid = voiced[frame_index] & (np.abs(periods / expected - 1) < PERIOD_TOLERANCE)
+    if valid.sum() < 12:
+        raise ValueError("too few regular glottal cycles found")
+    # Peak amplitude of the cycle each period starts with. Peak-to-peak within
+    # a period would pair one pulse's peak with the next pulse's trough
+    amplitudes = peaks[:-1]
+
+    f0 = 1.0 / periods[valid]
+    resampled = _resample(signal, sample_rate, ANALYSIS_RATE)
+    features = {'MDVP:Fo(Hz)': float(np.mean(f0)), 'MDVP:Fhi(Hz)': float(np.max(f0)), 'MDVP:Flo(Hz)': float(np.min(f0))}
+    features.update(perturbation_features(periods, amplitudes, valid))
+    features.update({'NHR': nhr, 'HNR': hnr, 'RPDE': rpde(resampled), 'DFA': dfa(resampled)})
+    features.update(pitch_entropy_features(f0))
+    features['D2'] = correlation_dimension(resampled)
+    return {name: float(features[name]) for name in EXPECTED_FEATURES}
+
+
+def extract_file(path: str) -> Dict[str, float]:
+    signal, sample_rate = read_wav(path)
+    try:
+        return extract_features(signal, sample_rate)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+def extract_files(paths: List[str], workers: int = 1):
+    import pandas as pd
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rows = list(executor.map(extract_file, paths, chunksize=max(1, len(paths) // (4 * workers))))
+    else:
+        rows = [extract_file(path) for path in paths]
+    # 'name' as in parkinsons.data, so the result can be uploaded to the app as is
+    names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    return pd.DataFrame(rows, columns=EXPECTED_FEATURES).assign(name=names)[['name'] + EXPECTED_FEATURES]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compute the model's voice features from WAV recordings.")
+    parser.add_argument('recordings', nargs='+', help="WAV files of sustained phonation (e.g. a held 'aaah')")
+    parser.add_argument('--output', help="CSV file for the features (default: print them)")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes, one recording each at a time")
+    args = parser.parse_args(argv)
+
+    try:
+        features = extract_files(args.recordings, args.workers)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.output:
+        features.to_csv(args.output, index=False)
+        print(f"Wrote features of {len(features)} recordings to {args.output}", file=sys.stderr)
+    else:
+        print(features.to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())